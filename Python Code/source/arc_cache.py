@@ -0,0 +1,138 @@
+'''
+@file: arc_cache.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Memoisation of arc length results (perimeters, s(t) tables and t(s) tables) keyed by the FDs
+'''
+
+# Import dependancies
+import os
+import zipfile
+import numpy as np
+import fourier as fr
+from lru import LRUCache, coefs_key
+
+class ArcLengthCache:
+    '''Constructor for a size-bounded LRU cache of arc length results, with an optional on-disk tier
+    so that repeat runs over the same FDs can skip the integration work.
+
+    args:
+        maxsize : maximum number of results held in memory
+        maxbytes : maximum total size in bytes of the results held in memory
+        directory : (optional) folder for the on-disk tier, created if it does not exist
+
+    '''
+
+    def __init__(self, maxsize=256, maxbytes=64*2**20, directory=None):
+        self.directory = directory
+        self.entries = LRUCache(maxsize, maxbytes)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _insert(self, key, value):
+        # Cached arrays are shared by every caller, so they are made read-only
+        for array in value:
+            array.setflags(write=False)
+        self.entries[key] = value
+
+    def _load(self, key):
+        # A file left truncated by an interrupted run is treated as a miss and rewritten
+        try:
+            with np.load(self._path(key)) as data:
+                return tuple(data[f'arr_{i}'] for i in range(len(data.files)))
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+            return None
+
+    def _save(self, key, value):
+        # Write to a temporary file and rename it, so the file is never seen half written
+        temp = self._path(key) + '.tmp.npz'
+        np.savez(temp, *value)
+        os.replace(temp, self._path(key))
+
+    def get(self, key, compute):
+        '''Function to look up a result, computing and storing it on a miss
+
+        args:
+            key : content address from coefs_key
+            compute : callable with no arguments returning a tuple of numpy arrays
+
+        returns:
+            value : tuple of numpy arrays
+
+        '''
+
+        # Memory tier
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+
+        # Disk tier
+        if self.directory is not None and os.path.exists(self._path(key)):
+            value = self._load(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._insert(key, value)
+                return value
+
+        self.misses += 1
+        value = tuple(np.array(array) for array in compute())
+        self._insert(key, value)
+        if self.directory is not None:
+            self._save(key, value)
+
+        return value
+
+    def stats(self):
+        '''Function to report the cache counters
+
+        returns:
+            stats : dictionary of hits, disk hits, misses, entries and bytes held in memory
+
+        '''
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'entries': len(self.entries), 'nbytes': self.entries.nbytes}
+
+    def clear(self):
+        '''Function to empty the memory tier and reset the counters. Files on disk are kept.
+        '''
+        self.entries.clear()
+        self.hits = self.misses = self.disk_hits = 0
+
+    def arc_length_coefs(self, coefs, num=None):
+        '''Cached version of fourier.arc_length_coefs'''
+        key = coefs_key('arc_length_coefs', coefs, num=num)
+        return self.get(key, lambda: fr.arc_length_coefs(coefs, num))
+
+    def perim_from_coefs(self, coefs):
+        '''Cached version of fourier.perim_from_coefs'''
+        return self.arc_length_coefs(coefs)[1][()]
+
+    def s_param(self, tpoints, coefs):
+        '''Cached version of fourier.s_param'''
+        key = coefs_key('s_param', coefs, grid=tpoints)
+        scoefs, perim = self.arc_length_coefs(coefs)[:2]
+        return self.get(key, lambda: (fr.arc_length_eval(tpoints, scoefs, perim),))[0]
+
+    def arc_length_table(self, coefs, num=None):
+        '''Cached version of fourier.arc_length_table'''
+        key = coefs_key('arc_length_table', coefs, num=num)
+        return self.get(key, lambda: fr.arc_length_table(coefs, num))
+
+    def t_param(self, spoints, coefs):
+        '''Cached version of fourier.t_param'''
+        key = coefs_key('t_param', coefs, grid=spoints)
+        table = self.arc_length_table(coefs)
+        return self.get(key, lambda: (fr.t_param(spoints, coefs, table=table),))[0]
+
+# Shared cache for scripts that reparameterise the same FDs several times
+default_cache = ArcLengthCache()
@@ -0,0 +1,264 @@
+'''
+@file: batch.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Headless command line interface running the research workflows over many inputs without prompts or GUI windows
+'''
+
+# Import dependancies
+import os
+import re
+import time
+import argparse
+from contextlib import contextmanager
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+import arc_cache as ac
+import data_io as io
+import fourier as fr
+import polygon as pol
+from reconstruction import Reconstruction
+
+tpoints = lambda num : np.arange(num) / num
+
+class StageTimer:
+    '''Constructor for a timer accumulating the wall-clock time spent in each named stage of a workflow.
+    '''
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0) + time.perf_counter() - start
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def summary(self):
+        '''Function to print the total, count and mean time of every stage
+        '''
+        print(f'\n{"stage":<16}{"calls":>8}{"total (s)":>12}{"mean (ms)":>12}')
+        for name, total in self.totals.items():
+            print(f'{name:<16}{self.counts[name]:>8}{total:>12.3f}{1000*total/self.counts[name]:>12.2f}')
+
+def safe_label(label):
+    '''Function to turn a pattern name or filename into a label usable in output filenames
+    '''
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'shape'
+
+def load_inputs(args, timer):
+    '''Function to load the shapes selected on the command line
+
+    args:
+        args : parsed command line arguments with patterns, csv, catalogue, images, num_points and polygon
+        timer : StageTimer
+
+    returns:
+        inputs : list of (label, coefs, polygon) tuples, where polygon is True for PFDs
+
+    '''
+    inputs = []
+
+    with timer.stage('load'):
+        # Patterns by number or name, from the binary catalogue or the .csv file
+        if args.patterns and args.catalogue:
+            # Only the requested shapes are read from the memory-mapped catalogue
+            import catalogue as cat
+            data = cat.Catalogue(args.catalogue)
+            for pattern in args.patterns:
+                if not pattern.isdigit() and pattern not in data.index:
+                    raise SystemExit(f'Pattern {pattern} is not in {args.catalogue}')
+                i = int(pattern) if pattern.isdigit() else data.index[pattern]
+                inputs.append((f'{i}_{data.names[i]}', np.array(data[i]), False))
+        elif args.patterns:
+            # Stream the .csv file, keeping only the requested rows (the first row of a repeated name)
+            numbers = {int(pattern) for pattern in args.patterns if pattern.isdigit()}
+            names = {pattern for pattern in args.patterns if not pattern.isdigit()}
+            found = {}
+            for chunk in io.iter_coefs(args.csv, names=None if numbers else names):
+                for i, name, coefs in zip(*chunk):
+                    for key in ((i,) if i in numbers else ()) + ((name,) if name in names else ()):
+                        if key not in found or i < found[key][0]:
+                            found[key] = (i, name, coefs.copy())
+            for pattern in args.patterns:
+                key = int(pattern) if pattern.isdigit() else pattern
+                if key not in found:
+                    raise SystemExit(f'Pattern {pattern} is not in {args.csv}')
+                i, name, coefs = found[key]
+                inputs.append((f'{i}_{name}', coefs, False))
+
+        # Images, as circular FDs of the boundary or PFDs of the vertices
+        for filename in args.images:
+            label = os.path.splitext(os.path.basename(filename))[0]
+            if args.polygon:
+                inputs.append((label, np.fft.fft(io.get_vertices(filename)), True))
+            else:
+                zpoints = io.get_boundary(filename, args.num_points)
+                inputs.append((label, fr.get_coefs_from_zpoints(zpoints, args.num_points), False))
+
+    if not inputs:
+        raise SystemExit('No inputs, give --patterns and/or --images')
+    return inputs
+
+def save_figure(fig, path, timer):
+    with timer.stage('write'):
+        fig.savefig(path, dpi=100)
+        plt.close(fig)
+
+def shape_axes(title):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    ax.set_aspect('equal')
+    ax.grid()
+    ax.set(title=title, xlabel='Real', ylabel='Imaginary')
+    return fig, ax
+
+def run_reconstruct(args, inputs, timer):
+    '''Reconstruct each shape, optionally low pass filtered (rescaled to the original area) and truncated,
+    as in main.py and main_for_lpf_*.py
+    '''
+    # Truncation is only defined for circular FDs
+    if args.pop and any(polygon for label, coefs, polygon in inputs):
+        raise SystemExit('--pop needs circular FDs, run it without --polygon')
+
+    for label, coefs, polygon in inputs:
+        plot = pol.polygon_plot if polygon else fr.fourier_plot
+
+        with timer.stage('filter'):
+            filtered = coefs
+            if args.pop:
+                filtered = fr.pop(filtered, args.pop)
+            if args.att is not None:
+                low_pass, rescale = (pol.low_pass, pol.poly_scale) if polygon else (fr.low_pass, fr.scale)
+                filtered = rescale(filtered, low_pass(filtered, args.att))
+
+        with timer.stage('synthesis'):
+            zpoints = plot(tpoints(args.T), coefs)
+            fil_zpoints = plot(tpoints(args.T), filtered)
+
+        with timer.stage('measure'):
+            areas = (pol.area(coefs), pol.area(filtered)) if polygon else (fr.area(coefs), fr.area(filtered))
+            perims = (pol.get_perim(coefs), pol.get_perim(filtered)) if polygon else (ac.default_cache.perim_from_coefs(coefs), ac.default_cache.perim_from_coefs(filtered))
+
+        with timer.stage('write'):
+            np.savez(os.path.join(args.out, f'{label}_reconstruct.npz'), coefs=coefs, filtered=filtered,
+                     zpoints=zpoints, fil_zpoints=fil_zpoints, area=areas, perim=perims)
+
+        fig, ax = shape_axes(label)
+        ax.scatter(np.real(zpoints), np.imag(zpoints), label='original')
+        if filtered is not coefs:
+            ax.scatter(np.real(fil_zpoints), np.imag(fil_zpoints), label='filtered')
+            ax.legend()
+        save_figure(fig, os.path.join(args.out, f'{label}_reconstruct.png'), timer)
+
+def run_pop(args, inputs, timer):
+    '''Remove the highest order coefficient one at a time down to --min-terms, as in fourier_pop.py
+    '''
+    # Popping terms is only defined for circular FDs
+    if any(polygon for label, coefs, polygon in inputs):
+        raise SystemExit('The pop workflow needs circular FDs, run it without --polygon')
+
+    for label, coefs, polygon in inputs:
+        steps = []
+        with timer.stage('synthesis'):
+            # Each removal only subtracts one term from the curve
+            shape = Reconstruction(tpoints(args.T), coefs)
+            while True:
+                steps.append((shape.coefs.size, shape.zpoints.copy()))
+                if shape.coefs.size <= args.min_terms:
+                    break
+                shape.pop(1)
+
+        with timer.stage('write'):
+            np.savez(os.path.join(args.out, f'{label}_pop.npz'), sizes=[size for size, z in steps],
+                     zpoints=np.array([z for size, z in steps]))
+
+        columns = min(len(steps), 4)
+        fig, axes = plt.subplots(-(-len(steps) // columns), columns, figsize=(4*columns, 4*(-(-len(steps) // columns))), squeeze=False)
+        for ax, (size, zpoints) in zip(axes.flat, steps):
+            ax.scatter(np.real(zpoints), np.imag(zpoints), s=8)
+            ax.set_aspect('equal')
+            ax.set_title(f'{size} coefficients')
+        for ax in axes.flat[len(steps):]:
+            ax.set_axis_off()
+        save_figure(fig, os.path.join(args.out, f'{label}_pop.png'), timer)
+
+def run_nalter(args, inputs, timer):
+    '''Reconstruct each shape with several numbers of points, as in fourier_N_alter.py
+    '''
+    for label, coefs, polygon in inputs:
+        plot = pol.polygon_plot if polygon else fr.fourier_plot
+        for T in args.N:
+            with timer.stage('synthesis'):
+                zpoints = plot(tpoints(T), coefs)
+            with timer.stage('write'):
+                np.save(os.path.join(args.out, f'{label}_N{T}.npy'), zpoints)
+            fig, ax = shape_axes(f'{label}, N = {T}')
+            ax.scatter(np.real(zpoints), np.imag(zpoints))
+            save_figure(fig, os.path.join(args.out, f'{label}_N{T}.png'), timer)
+
+def run_compare(args, inputs, timer):
+    '''Overlay every selected shape on one plot, as in fourier_compare.py
+    '''
+    fig, ax = shape_axes('Comparison')
+    for label, coefs, polygon in inputs:
+        with timer.stage('synthesis'):
+            zpoints = (pol.polygon_plot if polygon else fr.fourier_plot)(tpoints(args.T), coefs)
+        ax.scatter(np.real(zpoints), np.imag(zpoints), label=label)
+    ax.legend()
+    save_figure(fig, os.path.join(args.out, 'compare.png'), timer)
+
+def run_animate(args, inputs, timer):
+    '''Save an animation of each shape being drawn, as in main_animate.py (epicycles) and polygon_animate.py (sub-polygons)
+    '''
+    import main_animate
+    import polygon_animate as polani
+
+    for label, coefs, polygon in inputs:
+        with timer.stage('animate'):
+            if polygon:
+                polani.make_animation(coefs.copy(), os.path.join(args.out, f'{label}.mp4'))
+            else:
+                main_animate.make_animation(coefs, os.path.join(args.out, f'{label}.mp4'), frames=args.frames)
+            plt.close('all')
+
+workflows = {'reconstruct': run_reconstruct, 'pop': run_pop, 'nalter': run_nalter, 'compare': run_compare, 'animate': run_animate}
+
+def main():
+    '''Main program
+    '''
+    parser = argparse.ArgumentParser(description='Run the research workflows headless over many inputs')
+    parser.add_argument('workflow', choices=workflows, help='workflow to run')
+    parser.add_argument('-p', '--patterns', nargs='*', default=[], help='pattern numbers or names from the coefficients file')
+    parser.add_argument('-i', '--images', nargs='*', default=[], help='image files containing shapes')
+    parser.add_argument('--csv', default='fourier_coefficients.csv', help='coefficients .csv file')
+    parser.add_argument('--catalogue', default=None, help='binary coefficients catalogue, used instead of --csv')
+    parser.add_argument('--polygon', action='store_true', help='use PFDs of the image vertices instead of circular FDs')
+    parser.add_argument('-n', '--num-points', type=int, default=100, help='boundary points taken from each image')
+    parser.add_argument('-T', type=int, default=100, help='number of points to reconstruct')
+    parser.add_argument('-N', type=int, nargs='*', default=[10, 50, 100], help='numbers of points for the nalter workflow')
+    parser.add_argument('--att', type=float, default=None, help='low pass filter attenuation')
+    parser.add_argument('--pop', type=int, default=0, help='number of terms to remove before reconstructing')
+    parser.add_argument('--min-terms', type=int, default=2, help='smallest number of coefficients for the pop workflow')
+    parser.add_argument('--frames', type=int, default=150, help='number of frames for the animate workflow')
+    parser.add_argument('-o', '--out', default='batch_output', help='output folder for figures and results')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    timer = StageTimer()
+    inputs = [(safe_label(label), coefs, polygon) for label, coefs, polygon in load_inputs(args, timer)]
+    workflows[args.workflow](args, inputs, timer)
+
+    print(f'{len(inputs)} inputs written to {args.out}')
+    timer.summary()
+
+# Boiler plate guard for main()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+'''
+@file: catalogue.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Indexed binary catalogue of FDs, replacing repeated parsing of fourier_coefficients.csv
+'''
+
+# Import dependancies
+import os
+import sys
+import csv
+import numpy as np
+
+# File layout, all integers little-endian int64:
+#   magic (8 bytes), count, name_bytes, total
+#   offsets[count+1]       : FDs of shape i are data[offsets[i]:offsets[i+1]]
+#   name_offsets[count+1]  : name of shape i is names[name_offsets[i]:name_offsets[i+1]] (UTF-8)
+#   names[name_bytes], zero padding to a multiple of 16 bytes
+#   data[total]            : complex128 FDs of every shape end to end
+MAGIC = b'FDCAT001'
+HEADER = np.dtype([('magic', 'S8'), ('count', '<i8'), ('name_bytes', '<i8'), ('total', '<i8')])
+
+def write_catalogue(path, names, coefs):
+    '''Function to write a binary catalogue of FDs
+
+    args:
+        path : filename of the catalogue
+        names : list of shape names
+        coefs : list of numpy arrays of FDs, one per name, which may differ in length
+
+    '''
+    if len(names) != len(coefs):
+        raise ValueError('names and coefs must have the same length')
+
+    encoded = [name.encode('utf-8') for name in names]
+    sizes = [np.size(c) for c in coefs]
+    header = np.array([(MAGIC, len(names), sum(len(name) for name in encoded), sum(sizes))], dtype=HEADER)
+
+    with open(path, mode='wb') as file:
+        file.write(header.tobytes())
+        file.write(np.concatenate(([0], np.cumsum(sizes, dtype=np.int64))).astype('<i8').tobytes())
+        file.write(np.concatenate(([0], np.cumsum([len(name) for name in encoded], dtype=np.int64))).astype('<i8').tobytes())
+        file.write(b''.join(encoded))
+        file.write(b'\0' * (-file.tell() % 16))
+        for c in coefs:
+            file.write(np.asarray(c, dtype='<c16').tobytes())
+
+class Catalogue:
+    '''Constructor for read-only access to a binary catalogue of FDs. The FDs are memory-mapped, so looking up a shape
+    by number or name returns a zero-copy view without reading the rest of the file.
+
+    args:
+        path : filename of the catalogue
+
+    '''
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if header.size == 0 or header['magic'][0] != MAGIC:
+            raise ValueError(f'{path} is not an FD catalogue')
+        count, name_bytes, total = (int(header[field][0]) for field in ('count', 'name_bytes', 'total'))
+
+        tables = np.fromfile(path, dtype='<i8', count=2*(count+1), offset=HEADER.itemsize)
+        self.offsets = tables[:count+1]
+        name_offsets = tables[count+1:]
+
+        with open(path, mode='rb') as file:
+            file.seek(HEADER.itemsize + tables.nbytes)
+            blob = file.read(name_bytes)
+        self.names = [blob[name_offsets[i]:name_offsets[i+1]].decode('utf-8') for i in range(count)]
+
+        # First occurrence wins when names repeat
+        self.index = {}
+        for i, name in enumerate(self.names):
+            self.index.setdefault(name, i)
+
+        data_offset = HEADER.itemsize + tables.nbytes + name_bytes
+        data_offset += -data_offset % 16
+        self.data = np.memmap(path, dtype='<c16', mode='r', offset=data_offset, shape=(total,)) if total else np.zeros(0, dtype=np.complex_)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, key):
+        '''Function to look up the FDs of a shape
+
+        args:
+            key : pattern number or shape name
+
+        returns:
+            coefs : read-only numpy array of FDs (a view into the memory-mapped file)
+
+        '''
+        i = self.index[key] if isinstance(key, str) else range(len(self.names))[key]
+        return self.data[self.offsets[i]:self.offsets[i+1]]
+
+    def __iter__(self):
+        for i in range(len(self.names)):
+            yield self.names[i], self[i]
+
+    def sizes(self):
+        '''Function to report the number of FDs of every shape
+
+        returns:
+            sizes : numpy array of FD counts
+        '''
+        return np.diff(self.offsets)
+
+def convert_csv(csv_path, path):
+    '''Function to convert a fourier_coefficients.csv file into a binary catalogue
+
+    args:
+        csv_path : filename of the .csv file, one shape per row with the name followed by the FDs
+        path : filename of the catalogue to write
+
+    returns:
+        count : number of shapes written
+
+    '''
+    names = []
+    coefs = []
+    with open(csv_path, mode='r', encoding='utf-8') as file:
+        for row in csv.reader(file, delimiter=','):
+            if not row:
+                continue
+            names.append(row[0])
+            coefs.append(np.array([coef for coef in row[1:] if coef], dtype=np.complex_))
+
+    write_catalogue(path, names, coefs)
+    return len(names)
+
+def main():
+    '''Main program, converting the .csv file named by the first argument into the catalogue named by the second
+    '''
+    if len(sys.argv) != 3:
+        print('Usage: python catalogue.py fourier_coefficients.csv fourier_coefficients.fdcat')
+        sys.exit(1)
+
+    count = convert_csv(sys.argv[1], sys.argv[2])
+    print(f'{count} shapes written to {sys.argv[2]} ({os.path.getsize(sys.argv[2])} bytes)')
+
+# Boiler plate guard for main()
+if __name__ == '__main__':
+    main()
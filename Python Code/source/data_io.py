@@ -9,8 +9,6 @@
 import numpy as np
 import csv
 import cv2 as cv
-from shapely.geometry import LineString
-from shapely.ops import unary_union
 
 def get_csv_data():
     '''Function to extract data from the file fourier_coeffiecients.csv
@@ -35,8 +33,59 @@ def print_patterns(data):
     '''
 
     # Print pattern options
-    for row in data:
-        print(f'{data.index(row)} - {row[0]}')
+    for i, row in enumerate(data):
+        print(f'{i} - {row[0]}')
+
+def iter_coefs(filename='fourier_coefficients.csv', chunk_size=1024, names=None, sizes=None):
+    '''Generator to stream FDs from a .csv file in chunks, without reading the whole file. Rows are grouped by their
+    number of FDs so that each chunk is a 2D array that can be passed straight to the batched area, filter and synthesis
+    functions. At most chunk_size rows are held in total across all the numbers of FDs.
+
+    args:
+        filename : (optional) name of the .csv file, one pattern per row with the name followed by the FDs
+        chunk_size : (optional) largest number of rows in a chunk
+        names : (optional) collection of pattern names to keep, or callable returning True for names to keep
+        sizes : (optional) number of FDs, or collection of numbers of FDs, to keep
+
+    yields:
+        numbers : list of pattern numbers (row indices in the file, as printed by print_patterns)
+        pattern_names : list of pattern names
+        coefs : 2D numpy array of FDs with one row per pattern
+    
+    '''
+
+    if sizes is not None and np.ndim(sizes) == 0:
+        sizes = (sizes,)
+    keep_name = names if callable(names) or names is None else set(names).__contains__
+
+    buffers = {}
+    total = 0
+    with open(filename, mode='r', encoding='utf-8') as file:
+        for number, row in enumerate(csv.reader(file, delimiter=',')):
+            if not row or (keep_name is not None and not keep_name(row[0])):
+                continue
+            coefs = [coef for coef in row[1:] if coef]
+            if sizes is not None and len(coefs) not in sizes:
+                continue
+
+            buffer = buffers.setdefault(len(coefs), ([], [], []))
+            buffer[0].append(number)
+            buffer[1].append(row[0])
+            buffer[2].append(coefs)
+            total += 1
+
+            # Emit the largest buffer as soon as chunk_size rows are held, which is a full chunk when there is only
+            # one number of FDs
+            if total >= chunk_size:
+                size = max(buffers, key=lambda size: len(buffers[size][0]))
+                buffer = buffers.pop(size)
+                total -= len(buffer[0])
+                yield buffer[0], buffer[1], np.array(buffer[2], dtype=np.complex_).reshape(-1, size)
+
+    # Emit the partly filled buffers
+    for size in sorted(buffers):
+        buffer = buffers[size]
+        yield buffer[0], buffer[1], np.array(buffer[2], dtype=np.complex_).reshape(-1, size)
 
 def get_coefs(data, n=''):
     '''Function to prompt user from the console to select a pattern and return a numpy array of
@@ -101,6 +150,75 @@ def print_coefs(coefs, n=''):
     print(f'\nFourier Coefficients {n}:')
     [print(coef) for coef in coefs]
 
+def get_threshold(filename):
+    '''Function to read an image, convert it to greyscale and threshold it. Pixels with intensity values 0-127 are
+    considered the background of the shape and pixels with intensity values 128-255 are considered the foreground.
+
+    args:
+        filename : filename of the image
+
+    returns:
+        thresh : binary image with 0 for background and 255 for foreground
+    
+    '''
+
+    # Read the image and convert to greyscale
+    image = cv.imread(filename)
+    if image is None:
+        raise FileNotFoundError(f'Cannot read image {filename}')
+    image_gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY)
+
+    # Define a threshold of intensity values. 0-127 for background and 128-255 for foreground
+    return cv.threshold(image_gray, 127, 255, 0)[1]
+
+def resample_boundary(contours, num_points, closed=False):
+    '''Function to resample one or many polylines at points evenly spaced along their length. The cumulative length of
+    every contour is computed once and all the arc length positions are located with a single searchsorted.
+
+    args:
+        contours : numpy array of complex points along a polyline, or list of such arrays (which may differ in length)
+        num_points : number of evenly spaced points to return per contour
+        closed : (optional) include the segment from the last point back to the first, default False
+
+    returns:
+        zpoints : numpy array of num_points complex points, or 2D numpy array with one row per contour when contours is a list
+    
+    '''
+
+    single = isinstance(contours, np.ndarray) and contours.ndim == 1
+    contours = [np.asarray(contour, dtype=np.complex_) for contour in ([contours] if single else contours)]
+    if closed:
+        contours = [np.append(contour, contour[:1]) for contour in contours]
+
+    # A single point is treated as one segment of zero length
+    contours = [contour if contour.size > 1 else np.repeat(contour, 2) for contour in contours]
+
+    # Segments of every contour laid end to end, with their start points and lengths
+    starts = np.concatenate([contour[:-1] for contour in contours])
+    steps = np.concatenate([np.diff(contour) for contour in contours])
+    lengths = np.abs(steps)
+    positions = np.concatenate(([0], np.cumsum(lengths)))
+
+    # Each contour starts where the previous one ended on the shared length axis
+    num_segments = np.array([contour.size - 1 for contour in contours])
+    first_segment = np.concatenate(([0], np.cumsum(num_segments)))
+    offsets = positions[first_segment]
+    totals = offsets[1:] - offsets[:-1]
+
+    # Evenly spaced arc length positions for every contour
+    targets = offsets[:-1, np.newaxis] + totals[:, np.newaxis] * np.arange(num_points) / num_points
+
+    # Locate the segment containing each position, staying inside the contour's own segments
+    segment = np.searchsorted(positions, targets, side='right') - 1
+    segment = np.clip(segment, first_segment[:-1, np.newaxis], first_segment[1:, np.newaxis] - 1)
+
+    # Interpolate along the segment, segments of zero length give their start point
+    length = lengths[segment]
+    frac = np.where(length > 0, (targets - positions[segment]) / np.where(length > 0, length, 1), 0)
+    zpoints = starts[segment] + frac * steps[segment]
+
+    return zpoints[0] if single else zpoints
+
 def get_boundary(filename, num_points):
     '''Function to extract position values of points evenly spaced along a shape boundary from a 
     greyscale image. Pixels with intensity values 0-127 are considered the background of the shape and
@@ -115,31 +233,17 @@ def get_boundary(filename, num_points):
     
     '''
 
-    # Read the image and convert to greyscale
-    image = cv.imread(filename)
-    image_gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY)
-
-    # Define a threshold of intensity values. 0-127 for background and 128-255 for foreground
-    thresh = cv.threshold(image_gray, 127, 255, 0)[1]
+    # Threshold the image into background and foreground
+    thresh = get_threshold(filename)
 
     # Find the coordinates of points on the shape boundary
     contour = cv.findContours(thresh, cv.RETR_LIST, cv.CHAIN_APPROX_NONE)[0][0]
 
-    # Reformat the contour into a list of tuples
-    new_contour = []
-    [new_contour.append(tuple(point[0])) for point in contour]
+    # Convert the contour points to complex position values
+    contour = contour[:, 0, 0] - 1j*contour[:, 0, 1]
 
-    # Create a LineString object from the contour points
-    line = LineString(new_contour)
-
-    # Determine coordinates of points evenly spaced along the boundary
-    distances = np.linspace(0, line.length, num_points+1)[:-1]
-    points = [line.interpolate(distance).coords[:] for distance in distances]
-
-    # Reformat the points into a numpy array of complex position values
-    zpoints = np.array([], dtype = np.complex_)
-    for point in points:
-        zpoints = np.append(zpoints, point[0][0] - 1j*point[0][1])
+    # Determine points evenly spaced along the boundary
+    zpoints = resample_boundary(contour, num_points)
     
     return zpoints
 
@@ -156,12 +260,8 @@ def get_vertices(filename):
     
     '''
 
-    # Read the image and convert to greyscale
-    image = cv.imread(filename)
-    image_gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY)
-
-    # Define a threshold of intensity values. 0-127 for background and 128-255 for foreground
-    thresh = cv.threshold(image_gray, 127, 255, 0)[1]
+    # Threshold the image into background and foreground
+    thresh = get_threshold(filename)
 
     # Find the coordinates of points on the shape boundary
     contour = cv.findContours(thresh, cv.RETR_LIST, cv.CHAIN_APPROX_NONE)[0][0]
@@ -176,5 +276,76 @@ def get_vertices(filename):
 
     return vertices
 
+def get_contours(filename, num_points, min_area=10, sort_by='area'):
+    '''Function to extract every shape in a greyscale image, with its boundary points, vertices and FDs. Only the
+    outer boundary of a shape with holes is kept, and contours enclosing less than min_area pixels are ignored. The
+    boundaries are resampled together and their FDs are found with one batched FFT. The PFDs are found with one FFT
+    per group of contours with the same number of vertices.
+
+    args:
+        filename : filename of the image containing the shapes
+        num_points : number of points along each shape boundary to return
+        min_area : (optional) smallest contour area in pixels to keep
+        sort_by : (optional) 'area' to order the shapes from largest to smallest, or 'position' to order them
+                  top to bottom and then left to right by their bounding boxes
 
+    returns:
+        contours : dictionary with one entry per shape, in sorted order, of
+            'area' : numpy array of contour areas
+            'centroid' : numpy array of contour centroids in complex coordinate form
+            'boundary' : 2D numpy array of points evenly spaced along each boundary, one row per shape
+            'coefs' : 2D numpy array of circular FDs (c0 in the centre) of each boundary, one row per shape
+            'vertices' : list of numpy arrays of vertices in complex coordinate form
+            'pfds' : list of numpy arrays of PFDs of the vertices
+    
+    '''
 
+    # Find the coordinates of points on the outer boundary of every shape, so holes are not returned as shapes
+    thresh = get_threshold(filename)
+    found = cv.findContours(thresh, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_NONE)[0]
+
+    # Keep contours above the area threshold
+    areas = np.array([cv.contourArea(contour) for contour in found])
+    keep = np.flatnonzero(areas >= min_area) if len(found) else np.array([], dtype=int)
+    found = [found[i] for i in keep]
+    areas = areas[keep]
+
+    # Sort deterministically, breaking ties by position
+    boxes = np.array([cv.boundingRect(contour) for contour in found]).reshape(-1, 4)
+    if sort_by == 'area':
+        order = np.lexsort((boxes[:, 0], boxes[:, 1], -areas))
+    elif sort_by == 'position':
+        order = np.lexsort((-areas, boxes[:, 0], boxes[:, 1]))
+    else:
+        raise ValueError("sort_by must be 'area' or 'position'")
+    found = [found[i] for i in order]
+    areas = areas[order]
+
+    # Centroids from the image moments, falling back to the mean point for degenerate contours
+    centroids = np.zeros(len(found), dtype=np.complex_)
+    for i, contour in enumerate(found):
+        moments = cv.moments(contour)
+        if moments['m00']:
+            centroids[i] = moments['m10']/moments['m00'] - 1j*moments['m01']/moments['m00']
+        else:
+            centroids[i] = np.mean(contour[:, 0, 0]) - 1j*np.mean(contour[:, 0, 1])
+
+    # Resample every boundary and take all the FFTs together
+    points = [contour[:, 0, 0] - 1j*contour[:, 0, 1] for contour in found]
+    boundary = resample_boundary(points, num_points) if found else np.zeros((0, num_points), dtype=np.complex_)
+    coefs = np.fft.fftshift(np.fft.fft(boundary, axis=-1), axes=-1) / num_points
+
+    # Extract vertices, then find the PFDs of all contours with the same number of vertices together
+    vertices = []
+    for contour in found:
+        approx = cv.approxPolyDP(contour, 0.01 * cv.arcLength(contour, True), True)
+        vertices.append(approx[:, 0, 0] - 1j*approx[:, 0, 1])
+    pfds = [None] * len(vertices)
+    sizes = np.array([v.size for v in vertices])
+    for size in np.unique(sizes):
+        rows = np.flatnonzero(sizes == size)
+        for row, pfd in zip(rows, np.fft.fft(np.stack([vertices[i] for i in rows]), axis=-1)):
+            pfds[row] = pfd
+
+    return {'area': areas, 'centroid': centroids, 'boundary': boundary, 'coefs': coefs,
+            'vertices': vertices, 'pfds': pfds}
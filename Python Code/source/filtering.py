@@ -0,0 +1,80 @@
+'''
+@file: filtering.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Area rescaling and filter banks shared by the circular FD (fourier.py) and PFD (polygon.py) representations
+'''
+
+# Import dependancies
+import warnings
+import numpy as np
+
+def area_scale(coefs, new_coefs, area, centre, tol=1e-12):
+    '''Function to scale one or many sets of coefs to the area of the original shapes, keeping the original
+    centroid coefficient
+
+    args:
+        coefs : input numpy array of coefs, or 2D numpy array with one set of coefs per row
+        new_coefs : input numpy array of the other coefs, or 2D numpy array with one set per row
+        area : function returning the area of each set of coefs, fourier.area or polygon.area
+        centre : index of the centroid coefficient, int(N/2) for circular FDs and 0 for PFDs
+        tol : (optional) rows of new_coefs with area below tol times the original area are left
+              unscaled, with a warning, instead of dividing by zero
+
+    returns:
+        new_coefs : other coefs scaled
+
+    '''
+    coefs = np.asarray(coefs)
+    new_coefs = np.array(new_coefs, dtype=np.complex_)
+
+    a1 = area(coefs)        #find the area using the area func of both shapes
+    a2 = area(new_coefs)
+
+    # Degenerate shapes have no area to match, so keep their scale
+    degenerate = a2 <= tol*np.maximum(a1, np.finfo(float).tiny)
+    if np.any(degenerate):
+        warnings.warn("Cannot scale coefficients with near-zero area", RuntimeWarning)
+    scale_factor = np.where(degenerate, 1, a1/np.where(degenerate, 1, a2))    #and find the ratio between the two
+
+    new_coefs = new_coefs*np.sqrt(scale_factor)[..., np.newaxis]  #multiply the new shape by the square root of the ratio found. Square root since both x and
+                                                                  #y are multiplied
+    new_coefs[..., centre] = coefs[..., centre]
+
+    return new_coefs
+
+def filter_bank(coefs, filters, frequencies, scale, plot, rescale=True, tpoints=None):
+    '''Function to apply a bank of filters to one or many sets of coefs in one broadcasted operation
+
+    args:
+        coefs : input numpy array of coefs, or 2D numpy array with one set of coefs per row
+        filters : attenuation or numpy array of attenuations for the low pass transfer function
+                  1 / (1 + att*|frequency|), or callable or list of callables mapping the frequencies to the filter gains
+        frequencies : numpy array of the signed frequency of each coefficient
+        scale : function scaling filtered coefs to the area of the original, fourier.scale or polygon.poly_scale
+        plot : function reconstructing shapes from coefs, fourier.fourier_synth or polygon.polygon_plot
+        rescale : (optional) scale each filtered set to the area of the original, default True
+        tpoints : (optional) numpy array of t values at which to also reconstruct the filtered shapes
+
+    returns:
+        new_coefs : numpy array of filtered coefs with shape coefs.shape[:-1] + (number of filters, N)
+        zpoints : (only if tpoints is given) numpy array of reconstructed shapes with shape
+                  coefs.shape[:-1] + (number of filters, T)
+
+    '''
+    coefs = np.asarray(coefs, dtype=np.complex_)
+
+    # One row of gains per filter
+    if callable(filters) or (np.ndim(filters) and len(filters) and all(callable(h) for h in filters)):
+        filters = [filters] if callable(filters) else filters
+        gains = np.stack([np.broadcast_to(h(frequencies), frequencies.shape) for h in filters])
+    else:
+        gains = 1 / (1 + np.outer(np.atleast_1d(filters), np.absolute(frequencies)))
+
+    new_coefs = coefs[..., np.newaxis, :] * gains
+    if rescale:
+        new_coefs = scale(coefs[..., np.newaxis, :], new_coefs)
+
+    if tpoints is None:
+        return new_coefs
+    return new_coefs, plot(tpoints, new_coefs)
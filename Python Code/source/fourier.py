@@ -10,29 +10,91 @@ import numpy as np
 import scipy as sp
 from pynverse_modified.inverse import inversefunc
 import functools as ft
-import math
+from lru import LRUCache, coefs_key
+import filtering as flt
+
+def get_npoints(nsize):
+    '''Function to create the array of 'n' values for an array of FDs, with c0 at index int(nsize/2)
+
+    args:
+        nsize : number of FDs
+
+    returns:
+        npoints : numpy array of 'n' values from -m to m (odd nsize) or from -m to m-1 (even nsize)
+
+    '''
+    return np.arange(nsize) - int(nsize/2)
+
+def uniform_start(tpoints):
+    '''Function to check whether an array of t values is a uniform grid t0 + j/T, j = 0, ..., T-1
+
+    args:
+        tpoints : numpy array of inputs to the Fourier series function
+
+    returns:
+        t0 : first t value of the grid, or None if tpoints is not a uniform grid
+
+    '''
+    tpoints = np.asarray(tpoints, dtype=float)
+    if tpoints.ndim != 1 or tpoints.size < 2:
+        return None
+
+    grid = tpoints[0] + np.arange(tpoints.size) / tpoints.size
+    return tpoints[0] if np.allclose(tpoints, grid, rtol=0, atol=1e-12) else None
+
+# Largest number of elements in a table of complex exponentials built by fourier_synth
+synth_block = 2**20
+
+def fourier_synth(tpoints, coefs):
+    '''Function to evaluate the Fourier series for one or many sets of FDs in a single call. When
+    tpoints is a uniform grid (see uniform_start) the series is evaluated with one inverse FFT per
+    set, otherwise with a single matrix product.
+
+    args:
+        tpoints : numpy array of inputs to the Fourier series function
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+
+    returns:
+        zpoints : numpy array of outputs of the Fourier series function, with one row per set of FDs
+                  when coefs is 2D
+
+    '''
+    tpoints = np.asarray(tpoints, dtype=float)
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    npoints = get_npoints(coefs.shape[-1])
+
+    # Uniform grid with at least as many points as FDs: place each cn in bin n mod T and inverse FFT
+    t0 = uniform_start(tpoints)
+    if t0 is not None and tpoints.size >= npoints.size:
+        T = tpoints.size
+        bins = np.zeros(coefs.shape[:-1] + (T,), dtype=np.complex_)
+        bins[..., npoints % T] = coefs * np.exp(1j*2*np.pi*npoints*t0)
+        return T * np.fft.ifft(bins, axis=-1)
+
+    # Arbitrary t values: matrix products with the (N, T) table of complex exponentials, taken in
+    # blocks of t values so the table stays below synth_block elements
+    tflat = tpoints.ravel()
+    zpoints = np.zeros(coefs.shape[:-1] + tflat.shape, dtype=np.complex_)
+    block = max(1, synth_block // max(npoints.size, 1))
+    for start in range(0, tflat.size, block):
+        basis = np.exp(1j*2*np.pi*np.outer(npoints, tflat[start:start+block]))
+        zpoints[..., start:start+block] = coefs @ basis
+
+    return zpoints.reshape(coefs.shape[:-1] + tpoints.shape)
 
 def fourier_plot(tpoints, coefs):
     '''Function to implement Fourier series function based on FDs
 
     args:
         tpoints : numpy array of inputs to the Fourier series function
-        coefs : numpy array of FDs
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
 
     returns:
         zpoints : numpy array of outputs of the Fourier series function
 
     '''
 
-    # Determine index of c0
-    m = int(coefs.size/2)
-
-    # Add complex exponential Fourier terms
-    zpoints = 0
-    for n in range(-m, m + (coefs.size % 2)):
-        zpoints += coefs[n + m] * np.exp(1j*2*np.pi*n*tpoints)
-
-    return zpoints
+    return fourier_synth(tpoints, coefs)
 
 def s_param_integrand(tpoint, coefs):
     '''Function to implement the integrand for the function s(t) used for arc length parameterisation
@@ -71,6 +133,201 @@ def s_param_point(tpoint, coefs):
 
     return spoint
 
+def speed(tpoints, coefs):
+    '''Function to evaluate the speed |z'(t)| of the Fourier series function, which is the integrand
+    of s(t), for many t values and sets of FDs at once.
+
+    args:
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+
+    returns:
+        speeds : numpy array of |z'(t)| values, with one row per set of FDs when coefs is 2D
+
+    '''
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    npoints = get_npoints(coefs.shape[-1])
+    return np.absolute(fourier_synth(tpoints, 1j*2*np.pi*npoints*coefs))
+
+def arc_length_coefs(coefs, num=None):
+    '''Function to build the Fourier series of the arc length s(t). The speed |z'(t)| is sampled once
+    on a uniform grid of num points and transformed, so that s(t) = perim*t + p(t) - p(0) where the
+    periodic part p(t) is the term by term integral of the speed series.
+
+    args:
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+        num : (optional) odd number of speed samples, by default 32 per FD
+
+    returns:
+        scoefs : numpy array of FDs of p(t), centred on c0 like the input FDs
+        perim : shape perimeter (numpy array of perimeters when coefs is 2D)
+        error : estimate of the absolute error in s(t), taken from the upper half of the speed spectrum
+
+    '''
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    if num is None:
+        num = 32*coefs.shape[-1] + 1
+    num = int(num) | 1  # odd, so the spectrum has no unpaired Nyquist term
+
+    # Sample the speed once and take its Fourier series
+    spectrum = np.fft.fft(speed(np.arange(num) / num, coefs), axis=-1) / num
+    kpoints = np.fft.fftfreq(num, 1/num)
+
+    # Integrate term by term, the constant term gives the perimeter
+    perim = spectrum[..., 0].real
+    pcoefs = np.zeros(spectrum.shape, dtype=np.complex_)
+    pcoefs[..., 1:] = spectrum[..., 1:] / (1j*2*np.pi*kpoints[1:])
+
+    # Each discarded term could move s(t) by at most 2|pn|, estimate them from the upper half band
+    error = 2*np.sum(np.absolute(pcoefs[..., np.absolute(kpoints) > num/4]), axis=-1)
+
+    return np.fft.fftshift(pcoefs, axes=-1), perim, error
+
+# Interpolation grids for s(t) are refined until their error is below this fraction of the perimeter (or the
+# series error, if larger), and are limited to grid_max_points values in total
+grid_rtol = 1e-13
+grid_max_points = 2**22
+
+def interpolates(tpoints, num):
+    '''Function to decide whether arc_length_eval interpolates s(t) or synthesises it exactly. Uniform grids of
+    at least num points and any t values whose table of complex exponentials fits in synth_block elements are
+    synthesised exactly.
+
+    args:
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+        num : number of FDs of p(t)
+
+    returns:
+        interpolated : True if the Hermite interpolation path is taken
+    '''
+    tpoints = np.asarray(tpoints, dtype=float)
+    exact = (uniform_start(tpoints) is not None and tpoints.size >= num) or tpoints.size*num <= synth_block
+    return not exact
+
+def arc_length_grid(scoefs, tol):
+    '''Function to tabulate the periodic part p(t) of the arc length and its derivative on a uniform grid
+    t = j/size, using the FFT path of fourier_synth. Starting from the series' own grid, the grid is doubled
+    until the cubic Hermite interpolant of p(t) is within tol of p(t) at the midpoints of the grid, which are
+    the odd points of the doubled grid.
+
+    args:
+        scoefs : numpy array of FDs of p(t), or 2D numpy array with one set per row
+        tol : largest interpolation error accepted, or numpy array with one tolerance per set
+
+    returns:
+        pgrid : numpy array of p(j/size)
+        dpgrid : numpy array of p'(j/size)
+        error : estimate of the largest interpolation error, one per set of FDs
+
+    '''
+    scoefs = np.asarray(scoefs, dtype=np.complex_)
+    stacked = np.stack((scoefs, derivative_coefs(scoefs)))
+    size = scoefs.shape[-1]
+    pgrid, dpgrid = fourier_synth(np.arange(size) / size, stacked).real
+
+    while True:
+        finer = fourier_synth(np.arange(2*size) / (2*size), stacked).real
+
+        # Hermite interpolant at x = 1/2 of each interval against the exact midpoint values
+        pnext, dpnext = np.roll(pgrid, -1, axis=-1), np.roll(dpgrid, -1, axis=-1)
+        midpoints = (pgrid + pnext)/2 + (dpgrid - dpnext)/(8*size)
+        error = np.max(np.absolute(midpoints - finer[0][..., 1::2]), axis=-1)
+
+        # The finer grid is at least as accurate as the estimate, so it is the one returned
+        pgrid, dpgrid = finer
+        size *= 2
+        if np.all(error <= tol) or 2*pgrid.size > grid_max_points:
+            return pgrid, dpgrid, error
+
+def arc_length_eval(tpoints, scoefs, perim, grid=None, tol=None):
+    '''Function to evaluate s(t) = perim*t + p(t) - p(0) from the output of arc_length_coefs. Uniform
+    grids of at least as many points as FDs, and small sets of t values, are synthesised exactly (see
+    interpolates). Other t values are interpolated with cubic Hermite polynomials between the values and
+    slopes of p(t) on a grid from arc_length_grid, so the cost and memory grow with the number of t values
+    plus FDs rather than their product.
+
+    args:
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+        scoefs : numpy array of FDs of p(t), or 2D numpy array with one set per row
+        perim : shape perimeter, or numpy array of perimeters when scoefs is 2D
+        grid : (optional) precomputed output of arc_length_grid for these FDs
+        tol : (optional) interpolation tolerance passed to arc_length_grid when grid is not given, by
+              default grid_rtol times the perimeter
+
+    returns:
+        spoints : numpy array of s parameter inputs to the Fourier series function
+
+    '''
+    tpoints = np.asarray(tpoints, dtype=float)
+    axes = tuple(range(-tpoints.ndim, 0))
+
+    # p(0) is the sum of the FDs of p
+    p0 = np.expand_dims(np.sum(scoefs, axis=-1).real, axes)
+
+    if not interpolates(tpoints, np.shape(scoefs)[-1]):
+        periodic = fourier_synth(tpoints, scoefs).real
+    else:
+        if grid is None:
+            grid = arc_length_grid(scoefs, grid_rtol*np.asarray(perim) if tol is None else tol)
+        pgrid, dpgrid = grid[:2]
+        size = pgrid.shape[-1]
+
+        # Position of each t value within its grid interval, p(t) being periodic
+        u = np.mod(tpoints, 1) * size
+        j = np.minimum(np.floor(u).astype(int), size-1)
+        x = u - j
+        k = (j + 1) % size
+
+        # Cubic Hermite basis, slopes scaled to the interval width 1/size
+        periodic = ((2*x**3 - 3*x**2 + 1)*pgrid[..., j] + (x**3 - 2*x**2 + x)*dpgrid[..., j]/size +
+                    (3*x**2 - 2*x**3)*pgrid[..., k] + (x**3 - x**2)*dpgrid[..., k]/size)
+
+    return np.expand_dims(perim, axes)*tpoints + periodic - p0
+
+def arc_length(tpoints, coefs, num=None):
+    '''Function to evaluate s(t) for a whole array of t values (and sets of FDs) in one pass, using
+    the Fourier series of the arc length from arc_length_coefs.
+
+    args:
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+        num : (optional) number of speed samples, see arc_length_coefs
+
+    returns:
+        spoints : numpy array of s parameter inputs to the Fourier series function
+        error : estimate of the absolute error in spoints, from the series and from any interpolation
+
+    '''
+    scoefs, perim, error = arc_length_coefs(coefs, num)
+    if not interpolates(tpoints, scoefs.shape[-1]):
+        return arc_length_eval(tpoints, scoefs, perim), error
+
+    # Interpolate on a grid accurate to within the series error, and add its error to the estimate
+    grid = arc_length_grid(scoefs, np.maximum(error, grid_rtol*perim))
+    return arc_length_eval(tpoints, scoefs, perim, grid), error + grid[2]
+
+def arc_length_table(coefs, num=None):
+    '''Function to tabulate the cumulative arc length s(t) on a uniform grid of t values from 0 to 1.
+
+    args:
+        coefs : numpy array of FDs
+        num : (optional) number of speed samples, see arc_length_coefs
+
+    returns:
+        tgrid : numpy array of t values j/num, j = 0, ..., num
+        sgrid : numpy array of s(t) at each t value, ending at the perimeter
+        scoefs, perim : output of arc_length_coefs, for evaluating s(t) between grid points
+
+    '''
+    scoefs, perim = arc_length_coefs(coefs, num)[:2]
+
+    # The table uses the same resolution as the series so the synthesis takes the FFT path
+    num = scoefs.shape[-1]
+    tgrid = np.arange(num + 1) / num
+    sgrid = np.append(arc_length_eval(tgrid[:-1], scoefs, perim), perim)
+
+    return tgrid, sgrid, scoefs, perim
+
 def s_param(tpoints, coefs):
     '''Function to evaluate the function s(t) to reparameterise an array of t values into s values.
 
@@ -82,16 +339,90 @@ def s_param(tpoints, coefs):
         spoint : numpy array of s parameter inputs to the Fourier series function
     '''
 
-    # Loop through the array of t values, reparameterising each one
-    spoints = np.zeros(tpoints.size)
-    for i in range(tpoints.size):
-        spoints[i] = s_param_point(tpoints[i], coefs)
-    
-    return spoints
+    return arc_length(tpoints, coefs)[0]
+
+def derivative_coefs(coefs, k=1):
+    '''Function to determine the FDs of the k-th derivative of the Fourier series function, by
+    multiplying each cn by (i2πn)^k
+
+    args:
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+        k : (optional) order of the derivative
+
+    returns:
+        new_coefs : numpy array of FDs of the derivative
+
+    '''
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    return coefs * (1j*2*np.pi*get_npoints(coefs.shape[-1]))**k
+
+def derivatives(tpoints, coefs):
+    '''Function to evaluate the derivatives and local geometry of the Fourier series function for many
+    t values and sets of FDs at once. z'(t) and z''(t) are synthesised together in one call.
+
+    args:
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+
+    returns:
+        dz : numpy array of z'(t)
+        d2z : numpy array of z''(t)
+        tangent : numpy array of unit tangents z'(t)/|z'(t)|
+        normal : numpy array of unit normals, the tangents rotated by +π/2
+        kappa : numpy array of signed curvatures Im(conj(z')z'')/|z'|^3, positive when turning left
+
+    '''
+    dz, d2z = fourier_synth(tpoints, np.stack((derivative_coefs(coefs, 1), derivative_coefs(coefs, 2))))
+
+    # Points where the speed vanishes have no tangent, leave them as nan rather than dividing by zero
+    dz_abs = np.absolute(dz)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tangent = np.where(dz_abs > 0, dz / dz_abs, np.nan)
+        kappa = np.where(dz_abs > 0, np.imag(np.conj(dz)*d2z) / dz_abs**3, np.nan)
+
+    return dz, d2z, tangent, 1j*tangent, kappa
+
+def curvature(coefs, tpoints):
+    '''Function to evaluate the signed curvature of the shape at an array of t values
+
+    args:
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+
+    returns:
+        kappa : numpy array of signed curvatures
+
+    '''
+    return derivatives(tpoints, coefs)[4]
 
 def fsolve_func(spoint, coefs):
     return (s_param_point(spoint, coefs) - spoint)
 
+# Cache of inverses of s(t) keyed by the FDs, bounded by number of entries
+inverse_cache = LRUCache(maxsize=32)
+
+def t_param_inverse(coefs):
+    '''Function to return the persistent inverse of s(t) for a set of FDs. The trend, image and a coarse table of
+    s(t) over 0 <= t <= 1 are worked out once per set of FDs, and the last solution seeds the next query, so
+    repeated s to t queries on the same shape (especially in sorted order) cost a few quad integrations each.
+
+    args:
+        coefs : numpy array of FDs
+
+    returns:
+        inverse : pynverse_modified.InverseFunction taking s values and returning t values
+
+    '''
+    coefs = np.array(coefs, dtype=np.complex_)
+    key = coefs_key('t_param_inverse', coefs)
+    if key in inverse_cache:
+        return inverse_cache[key]
+
+    inverse = inversefunc(ft.partial(s_param_point, coefs=coefs), method='illinois', vectorized=False,
+                          fprime=ft.partial(speed, coefs=coefs), table=17, table_range=(0, 1))
+    inverse_cache[key] = inverse
+    return inverse
+
 def t_param_point(spoint, coefs):
     '''Function to evaluate the inverse of s(t) to reparameterise a single s value into an t value.
 
@@ -110,38 +441,76 @@ def t_param_point(spoint, coefs):
     print(tpoint)
     '''
 
-    tpoint = inversefunc(ft.partial(s_param_point, coefs=coefs), y_values=spoint)
+    tpoint = t_param_inverse(coefs)(spoint)
 
     return tpoint
 
-def t_param(spoints, coefs):
+def t_param(spoints, coefs, tol=1e-10, max_iter=20, table=None):
     '''Function to evaluate the inverse of s(t) to reparameterise an array of s values into t values.
+    All points are seeded by interpolating the cumulative arc length table and then refined together
+    with Newton steps t -> t - (s(t) - s)/|z'(t)|.
 
     args:
         spoints : numpy array of s parameter inputs to the Fourier series function
         coefs : numpy array of FDs
+        tol : (optional) convergence tolerance on s(t) - s, relative to the perimeter
+        max_iter : (optional) maximum number of Newton steps
+        table : (optional) precomputed output of arc_length_table for these FDs
 
     returns:
         tpoint : numpy array of t parameter inputs to the Fourier series function
     
     '''
+    spoints = np.asarray(spoints, dtype=float)
+    tgrid, sgrid, scoefs, perim = arc_length_table(coefs) if table is None else table
+
+    # s(t) is non-decreasing, so the table can be inverted by interpolation
+    tpoints = np.interp(spoints, sgrid, tgrid)
+
+    # Interpolate s(t) well within the tolerance, so the iteration converges to s(t) and not the interpolant
+    grid = None
+    if interpolates(tpoints, scoefs.shape[-1]):
+        grid = arc_length_grid(scoefs, 0.1*tol*perim)
+
+    # Refine every point at once, guarding against stationary points where the speed vanishes
+    for i in range(max_iter):
+        residual = arc_length_eval(tpoints, scoefs, perim, grid) - spoints
+        if np.all(np.absolute(residual) <= tol*perim):
+            break
+        step = residual / np.maximum(speed(tpoints, coefs), 1e-12*perim)
+        tpoints = np.clip(tpoints - step, 0, 1)
 
-    tpoints = np.zeros(spoints.size)
-    for i in range(spoints.size):
-        tpoints[i] = t_param_point(spoints[i], coefs)
     return tpoints
 
+def arc_param_coefs(coefs, N=64):
+    '''Function to determine the FDs of the shape parameterised by arc length, sampled at N points
+    evenly spaced around the perimeter (the Python version of arcParamFDs.m).
+
+    args:
+        coefs : numpy array of FDs parameterised by t
+        N : (optional) number of FDs to return
+
+    returns:
+        new_coefs : numpy array of FDs parameterised by arc length
+
+    '''
+    # One arc length table gives both the perimeter and the seeds for t_param
+    table = arc_length_table(coefs)
+    spoints = table[3] * np.arange(N) / N
+    zpoints = fourier_synth(t_param(spoints, coefs, table=table), coefs)
+    return get_coefs_from_zpoints(zpoints, N)
+
 def perim_from_coefs(coefs):
     '''Function to calculate the shape perimeter from the FDs
 
     args:
-        coefs : numpy array of FDs
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
 
     returns:
         perim : shape perimeter
     
     '''
-    return s_param_point(1, coefs)
+    return arc_length_coefs(coefs)[1]
 
 def perim_from_z(zpoints):
     '''Function to calculate the shape perimeter from the boundary
@@ -166,47 +535,34 @@ def area(coefs):
     '''Function to calculate the area of a boundary from the corresponding FDs
 
     args:
-        coefs : numpy array of FDs
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
 
     returns:
-        tpoint : numpy array of t parameter inputs to the Fourier series function
+        area : area of the boundary, or numpy array of areas when coefs is 2D
     
     '''
-    # Initialise area to zero
-    area = 0
-
-    # Determine index of c0
-    m = int(coefs.size/2)
+    coefs = np.asarray(coefs)
 
-    # For each coefficient cn, increment area by pi*|cn|, except for c0
-    for n in range(-m, m + (coefs.size % 2)):
-        area += n* np.pi * ((np.absolute(coefs[n+m]))**2)
+    # Each coefficient cn contributes n*pi*|cn|^2, so c0 contributes nothing
+    npoints = get_npoints(coefs.shape[-1])
+    area = np.sum(npoints * np.pi * np.absolute(coefs)**2, axis=-1)
 
     return np.abs(area)
 
-def scale(coefs, new_coefs):
+def scale(coefs, new_coefs, tol=1e-12):
     '''scale the new set of zpoints using the original set of z points
 
     args:
-        coefs : input numpy array of coefs from 0 to N-1
-        new_coefs : input numpy array of the other coefs from 0 to N-1
+        coefs : input numpy array of coefs, or 2D numpy array with one set of coefs per row
+        new_coefs : input numpy array of the other coefs, or 2D numpy array with one set per row
+        tol : (optional) rows of new_coefs with area below tol times the original area are left
+              unscaled, with a warning, instead of dividing by zero
 
     returns:
         new_coefs : other coefs scaled
     
     '''
-
-    a1 = area(coefs)        #find the area using the area func of both shapes
-    a2 = area(new_coefs)
-    scale_factor = a1/a2    #and find the ratio between the two
-    
-    new_coefs = new_coefs*math.sqrt(scale_factor)  #multiply the new shape by the square root of the ratio found. Square root since both x and
-                                                       #y are multiplied
-
-    m = int(coefs.size/2)
-    new_coefs[m] = coefs[m]
-    
-    return new_coefs
+    return flt.area_scale(coefs, new_coefs, area, int(np.shape(new_coefs)[-1]/2), tol)
 
 def pop(coefs, num_terms):
     '''Function to remove terms from an array of FDs.
@@ -244,3 +600,21 @@ def low_pass(coefs, att):
     npoints = np.linspace(0, nsize-1, nsize, dtype=int) - int(nsize/2)
     new_coefs = coefs / (1 + att * np.absolute(npoints))
     return new_coefs
+
+def filter_bank(coefs, filters, rescale=True, tpoints=None):
+    '''Function to apply a bank of filters to one or many sets of FDs in one broadcasted operation
+
+    args:
+        coefs : input numpy array of coefs, or 2D numpy array with one set of coefs per row
+        filters : attenuation or numpy array of attenuations for the low_pass transfer function
+                  1 / (1 + att*|n|), or callable or list of callables mapping the array of n values to the filter gains
+        rescale : (optional) scale each filtered set to the area of the original, default True
+        tpoints : (optional) numpy array of t values at which to also reconstruct the filtered shapes
+
+    returns:
+        new_coefs : numpy array of filtered coefs with shape coefs.shape[:-1] + (number of filters, N)
+        zpoints : (only if tpoints is given) numpy array of reconstructed shapes with shape
+                  coefs.shape[:-1] + (number of filters, T)
+    
+    '''
+    return flt.filter_bank(coefs, filters, get_npoints(np.shape(coefs)[-1]), scale, fourier_synth, rescale, tpoints)
@@ -11,81 +11,270 @@ import numpy as np
 import matplotlib
 matplotlib.use('QtAgg')
 from PyQt6 import QtWidgets as qt
+from PyQt6 import QtCore
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
+import fourier as fr
+import polygon as pol
+
 convert_db = lambda x : 20*np.log10(x + 10**(-6))
 
-class ShapePlot(FigureCanvasQTAgg):
-    '''Constructor for creating a plot of the shape based on output of 
-    the Fourier series calculation.
+# Largest number of coefficients labelled with their n value, labels are skipped above this
+label_limit = 100
+
+# Persistent window, created by the first call to create_window and updated in place afterwards
+window = None
+
+# Time in ms the explorer sliders must rest before the shapes are recomputed
+debounce_ms = 100
+
+tpoints = lambda num : np.arange(num) / num
+
+def get_app():
+    '''Function to return the QApplication, creating it on first use. Only one QApplication can exist,
+    so every window shares it.
+
+    returns:
+        app : QApplication
+
+    '''
+    app = qt.QApplication.instance()
+    if app is None:
+        app = qt.QApplication(sys.argv)
+    return app
+
+def fit_limits(ax, x, y):
+    '''Function to fit the axis limits to new data, only when the data leaves the current limits or
+    fills less than half of them, so that small changes can be blitted without a full redraw.
+
+    args:
+        ax : matplotlib axes
+        x : numpy array of x values
+        y : numpy array of y values
+
+    returns:
+        changed : True if the limits were changed
+
+    '''
+    if np.size(x) == 0:
+        return False
+
+    xmin, xmax, ymin, ymax = np.min(x), np.max(x), np.min(y), np.max(y)
+    xpad = 0.05*(xmax - xmin) or 1
+    ypad = 0.05*(ymax - ymin) or 1
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+
+    inside = xmin >= x0 and xmax <= x1 and ymin >= y0 and ymax <= y1
+    tight = xmax - xmin + 2*xpad >= 0.5*(x1 - x0) and ymax - ymin + 2*ypad >= 0.5*(y1 - y0)
+    if inside and tight:
+        return False
+
+    ax.set_xlim(xmin - xpad, xmax + xpad)
+    ax.set_ylim(ymin - ypad, ymax + ypad)
+    return True
+
+def index_points(nsize, shift=0):
+    '''Function to create the n values used to label an array of coefficients
+
+    args:
+        nsize : number of coefficients
+        shift : set to one to centre coefficients around zero
+
+    returns:
+        npoints : numpy array of n values
+
+    '''
+    return np.linspace(0, nsize-1, nsize, dtype=int) - shift*int(nsize/2)
+
+def filter_shape(coefs, polygon, att, terms, T):
+    '''Function to truncate, low pass filter and rescale a set of FDs and reconstruct the shape before and after,
+    as in main_for_lpf_protuberance.py and main_for_lpf_star.py. This is the work done by the explorer worker thread.
+
+    args:
+        coefs : numpy array of FDs (circular, centred on c0) or PFDs (from 0 to N-1)
+        polygon : True if coefs are PFDs
+        att : attenuation of the low pass filter, 0 for no filtering
+        terms : number of FDs kept by fourier.pop, ignored for PFDs
+        T : number of points to reconstruct
+
+    returns:
+        data : tuple (zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2) for MainWindow.update_data, shape 1
+               being the original and shape 2 the filtered shape
+
+    '''
+    if polygon:
+        plot, low_pass, rescale = pol.polygon_plot, pol.low_pass, pol.poly_scale
+        fil_coefs = coefs
+    else:
+        plot, low_pass, rescale = fr.fourier_plot, fr.low_pass, fr.scale
+        fil_coefs = fr.pop(coefs, coefs.size - terms)
+
+    if att > 0:
+        fil_coefs = rescale(fil_coefs, low_pass(fil_coefs, att))
+
+    zpoints = plot(tpoints(T), coefs)
+    fil_zpoints = plot(tpoints(T), fil_coefs)
+
+    return zpoints, coefs, index_points(coefs.size), fil_zpoints, fil_coefs, index_points(fil_coefs.size)
+
+class FilterWorker(QtCore.QObject):
+    '''Constructor for the worker that runs filter_shape off the UI thread. Each request carries a generation
+    number, and requests or results older than the latest generation are dropped.
+    '''
+
+    finished = QtCore.pyqtSignal(int, object)
+
+    def __init__(self):
+        super(FilterWorker, self).__init__()
+        self.latest = 0
+
+    @QtCore.pyqtSlot(int, object)
+    def compute(self, generation, params):
+        # Skip requests overtaken by a newer slider position while queued or while computing
+        if generation != self.latest:
+            return
+        data = filter_shape(**params)
+        if generation == self.latest:
+            self.finished.emit(generation, data)
+
+class BlitCanvas(FigureCanvasQTAgg):
+    '''Constructor for a canvas whose data artists are animated. The axes, grid and labels are drawn once
+    and cached as the background, and new data is shown by restoring the background and blitting only
+    the data artists. A full redraw happens only when the axis limits change or the canvas is resized.
 
     args:
         width : int specifying figure width
         height : int specifying figure height
-        zpoints1 : numpy array of z values to be plotted to draw shape 1
-        zpoints2 : numpy array of z values to be plotted to draw shape 2
-    
+
     '''
 
-    def __init__(self, width, height, zpoints1, zpoints2):
+    def __init__(self, width, height):
 
         fig = Figure(figsize=(width, height), dpi=100)
         self.ax = fig.add_subplot(111)
         self.ax.grid()
+        self.artists = []
+        self.background = None
+
+        super(BlitCanvas, self).__init__(fig)
+        self.mpl_connect('draw_event', self.on_draw)
+
+    def add_artist(self, artist):
+        artist.set_animated(True)
+        self.artists.append(artist)
+        return artist
+
+    def on_draw(self, event):
+        # Cache the background after every full redraw, then draw the data on top
+        self.background = self.copy_from_bbox(self.figure.bbox)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def refresh(self, full=False):
+        '''Function to show the updated artists, blitting them onto the cached background unless a full
+        redraw is needed
+        '''
+        if full or self.background is None:
+            self.draw_idle()
+            return
+
+        self.restore_region(self.background)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+        self.blit(self.figure.bbox)
+
+class ShapePlot(BlitCanvas):
+    '''Constructor for creating a plot of the shape based on output of
+    the Fourier series calculation.
+
+    args:
+        width : int specifying figure width
+        height : int specifying figure height
+
+    '''
+
+    def __init__(self, width, height):
+
+        super(ShapePlot, self).__init__(width, height)
         self.ax.set_aspect('equal')
         self.ax.set(title = 'Shape', xlabel='Real', ylabel='Imaginary')
-        self.ax.scatter(np.real(zpoints1), np.imag(zpoints1))
-        if zpoints2.all():
-            self.ax.scatter(np.real(zpoints2), np.imag(zpoints2))
+        self.shape1 = self.add_artist(self.ax.scatter([], [], color='C0'))
+        self.shape2 = self.add_artist(self.ax.scatter([], [], color='C1'))
 
-        super(ShapePlot, self).__init__(fig)
+    def update_data(self, zpoints1, zpoints2):
+        '''Function to replace the plotted shapes
 
-class CoefPlot(FigureCanvasQTAgg):
-    '''Constructor for creating a plot of the Fourier coefficients on the complex plane.
+        args:
+            zpoints1 : numpy array of z values to be plotted to draw shape 1
+            zpoints2 : numpy array of z values to be plotted to draw shape 2, may be empty
+
+        '''
+        self.shape1.set_offsets(np.column_stack((np.real(zpoints1), np.imag(zpoints1))))
+        self.shape2.set_offsets(np.column_stack((np.real(zpoints2), np.imag(zpoints2))))
+
+        zpoints = np.concatenate((np.ravel(zpoints1), np.ravel(zpoints2)))
+        self.refresh(fit_limits(self.ax, np.real(zpoints), np.imag(zpoints)))
+
+class CoefPlot(BlitCanvas):
+    '''Constructor for creating a plot of the Fourier coefficients on the complex plane. Coefficients are
+    labelled with their n value only when there are at most label_limit of them.
 
     args:
         width : int specifying figure width
         height : int specifying figure height
-        coefs1 : numpy array of coefficients used to draw shape 1
-        coefs2 : numpy array of coefficients used to draw shape 2
-    
+
     '''
 
-    def __init__(self, width, height, coefs1, npoints1, coefs2, npoints2):
+    def __init__(self, width, height):
 
-        fig = Figure(figsize=(width, height), dpi=100)
-        self.ax = fig.add_subplot(111)
-        self.ax.grid()
+        super(CoefPlot, self).__init__(width, height)
         self.ax.set_aspect('auto')
         self.ax.set(title = 'Fourier Descriptors', xlabel='Real', ylabel='Imaginary')
-
-        self.ax.scatter(np.real(coefs1), np.imag(coefs1))
-        np.vectorize(self.ax.text)(np.real(coefs1), np.imag(coefs1), npoints1, fontsize=11)
-        print(coefs2.all())
-
-        if np.any(coefs2):
-            self.ax.scatter(np.real(coefs2), np.imag(coefs2))
-            np.vectorize(self.ax.text)(np.real(coefs2), np.imag(coefs2), npoints2, fontsize=11)
-
-        super(CoefPlot, self).__init__(fig)
-
-class CoefStem(FigureCanvasQTAgg):
+        self.coefs1 = self.add_artist(self.ax.scatter([], [], color='C0'))
+        self.coefs2 = self.add_artist(self.ax.scatter([], [], color='C1'))
+        self.labels = []
+
+    def update_data(self, coefs1, npoints1, coefs2, npoints2):
+        '''Function to replace the plotted coefficients
+
+        args:
+            coefs1 : numpy array of coefficients used to draw shape 1
+            npoints1 : numpy array of n values of coefs1
+            coefs2 : numpy array of coefficients used to draw shape 2, may be empty
+            npoints2 : numpy array of n values of coefs2
+
+        '''
+        self.coefs1.set_offsets(np.column_stack((np.real(coefs1), np.imag(coefs1))))
+        self.coefs2.set_offsets(np.column_stack((np.real(coefs2), np.imag(coefs2))))
+
+        # Replace the labels, skipping them for large coefficient sets
+        for label in self.labels:
+            label.remove()
+            self.artists.remove(label)
+        self.labels = []
+        for coefs, npoints in ((coefs1, npoints1), (coefs2, npoints2)):
+            if np.size(coefs) <= label_limit:
+                self.labels += [self.add_artist(self.ax.text(np.real(c), np.imag(c), n, fontsize=11))
+                                for c, n in zip(coefs, npoints)]
+
+        coefs = np.concatenate((np.ravel(coefs1), np.ravel(coefs2)))
+        self.refresh(fit_limits(self.ax, np.real(coefs), np.imag(coefs)))
+
+class CoefStem(BlitCanvas):
     '''Constructor for creating a stem plot of the Fourier Coefficients.
 
     args:
         width : int specifying figure width
         height : int specifying figure height
-        coefs1 : numpy array of coefficients used to draw shape 1
-        coefs2 : numpy array of coefficients used to draw shape 2
-    
+        db : set to 1 to label the magnitude axis in dB
+        mag : set to 1 for magnitudes, 0 for phases
+
     '''
-    
-    def __init__(self, width, height, coefs1, npoints1, coefs2, npoints2, db, mag):
 
-        fig = Figure(figsize=(width, height), dpi=100)
-        self.ax = fig.add_subplot(111)
-        self.ax.grid()
+    def __init__(self, width, height, db, mag):
+
+        super(CoefStem, self).__init__(width, height)
         self.ax.set_aspect('auto')
         if mag:
             if db:
@@ -95,37 +284,95 @@ class CoefStem(FigureCanvasQTAgg):
         else:
             self.ax.set(title = 'Phase of Fourier Descriptors', xlabel='n', ylabel='arg(cn)')
 
-        if np.any(coefs2): self.ax.stem(npoints2, coefs2, 'orange')
-        self.ax.stem(npoints1, coefs1)
+        # Shape 2 is drawn underneath shape 1
+        self.stems = []
+        for color in ('C1', 'C0'):
+            markerline, stemlines, baseline = self.ax.stem([0], [0], linefmt=color+'-', markerfmt=color+'o', basefmt='C3-')
+            self.stems.append(tuple(self.add_artist(artist) for artist in (markerline, stemlines, baseline)))
+
+    def update_data(self, coefs1, npoints1, coefs2, npoints2):
+        '''Function to replace the stems
+
+        args:
+            coefs1 : numpy array of real values to plot for shape 1
+            npoints1 : numpy array of n values of coefs1
+            coefs2 : numpy array of real values to plot for shape 2, may be empty
+            npoints2 : numpy array of n values of coefs2
+
+        '''
+        for (markerline, stemlines, baseline), coefs, npoints in zip(self.stems, (coefs2, coefs1), (npoints2, npoints1)):
+            for artist in (markerline, stemlines, baseline):
+                artist.set_visible(np.size(coefs) > 0)
+            if np.size(coefs) == 0:
+                continue
+            markerline.set_data(npoints, coefs)
+            stemlines.set_segments(np.stack((np.column_stack((npoints, np.zeros(np.size(coefs)))),
+                                             np.column_stack((npoints, coefs))), axis=1))
+            baseline.set_data([np.min(npoints), np.max(npoints)], [0, 0])
+
+        npoints = np.concatenate((np.ravel(npoints1), np.ravel(npoints2)))
+        coefs = np.concatenate((np.ravel(coefs1), np.ravel(coefs2), [0]))
+        self.refresh(fit_limits(self.ax, npoints, coefs))
+
+class CoefHist(BlitCanvas):
+    '''Constructor for creating a histogram of the phases of the Fourier coefficients, with 50 bins
+    from -pi to pi.
 
-        super(CoefStem, self).__init__(fig)
+    args:
+        width : int specifying figure width
+        height : int specifying figure height
 
-class CoefHist(FigureCanvasQTAgg):
+    '''
 
-    def __init__(self, width, height, coefs1, npoints1, coefs2, npoints2):
-        fig = Figure(figsize=(width, height), dpi=100)
-        self.ax = fig.add_subplot(111)
-        self.ax.grid()
+    def __init__(self, width, height):
+
+        super(CoefHist, self).__init__(width, height)
         self.ax.set_aspect('auto')
         self.ax.set(title = 'Phase of Fourier Descriptors (Histogram)', xlabel='arg(cn)')
-        #if np.any(coefs2): self.ax.hist(npoints2, coefs2, 'orange')
-        self.ax.hist(coefs1, 50)
-        super(CoefHist, self).__init__(fig)
+        self.edges = np.linspace(-np.pi, np.pi, 51)
+        self.ax.set_xlim(-np.pi, np.pi)
+        self.bars = [self.add_artist(bar) for bar in self.ax.bar(self.edges[:-1], np.zeros(50), np.diff(self.edges), align='edge')]
+
+    def update_data(self, coefs1, npoints1, coefs2, npoints2):
+        '''Function to replace the histogram of shape 1 phases
+
+        args:
+            coefs1 : numpy array of phases of shape 1
+            npoints1 : numpy array of n values of coefs1
+            coefs2 : (unused) numpy array of phases of shape 2
+            npoints2 : (unused) numpy array of n values of coefs2
+
+        '''
+        counts = np.histogram(coefs1, self.edges)[0]
+        for bar, count in zip(self.bars, counts):
+            bar.set_height(count)
+
+        # Only the count axis is refitted
+        top = max(np.max(counts), 1)
+        full = not 0.5*self.ax.get_ylim()[1] <= 1.05*top <= self.ax.get_ylim()[1]
+        if full:
+            self.ax.set_ylim(0, 1.05*top)
+        self.refresh(full)
 
 class MainWindow(qt.QMainWindow):
-    '''Constructor for creating the PyQt window.
+    '''Constructor for creating the PyQt window. The plots are built once and their data is replaced in
+    place by update_data.
 
     args:
         zpoints1 : numpy array of z values to be plotted to draw shape 1
         coefs1 : numpy array of coefficients used to draw shape 1
         zpoints2 : numpy array of z values to be plotted to draw shape 2
         coefs2 : numpy array of coefficients used to draw shape 2
-    
+
     '''
 
+    requested = QtCore.pyqtSignal(int, object)
+
     def __init__(self, zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2, shift):
         super(MainWindow, self).__init__()
 
+        self.sliders = None
+
         self.setGeometry(0, 0, 1600, 1000)
 
         layout = qt.QVBoxLayout()
@@ -133,31 +380,28 @@ class MainWindow(qt.QMainWindow):
         layout_figs2 = qt.QHBoxLayout()
 
         # Plot for the shape
-        fig_shape = ShapePlot(width=5, height=4, zpoints1=zpoints1, zpoints2=zpoints2)
-        layout_figs1.addWidget(fig_shape)
+        self.fig_shape = ShapePlot(width=5, height=4)
+        layout_figs1.addWidget(self.fig_shape)
 
         # Plot for Fourier coefficients on the complex plane
-        fig_coefs = CoefPlot(width=5, height=4, coefs1=coefs1, npoints1=npoints1, coefs2=coefs2, npoints2=npoints2)
-        layout_figs2.addWidget(fig_coefs)
+        self.fig_coefs = CoefPlot(width=5, height=4)
+        layout_figs2.addWidget(self.fig_coefs)
 
         # Plot for the magnitudes of Fourier coefficeints
-        fig_coefs_mag = CoefStem(width=5, height=4, coefs1=np.abs(coefs1), npoints1=npoints1, coefs2=np.abs(coefs2), npoints2=npoints2, db=0, mag=1)
-        layout_figs1.addWidget(fig_coefs_mag)
+        self.fig_coefs_mag = CoefStem(width=5, height=4, db=0, mag=1)
+        layout_figs1.addWidget(self.fig_coefs_mag)
 
         # Plot for the magnitudes of Fourier coefficeints (dB)
-        fig_coefs_mag_db = CoefStem(width=5, height=4, coefs1=convert_db(np.abs(coefs1)), npoints1=npoints1, coefs2=convert_db(np.abs(coefs2)), npoints2=npoints2, db=1, mag=1)
-        layout_figs2.addWidget(fig_coefs_mag_db)
-
-        # Set very small FDs to zero, to avoid random phase values
-        coefs1[np.abs(coefs1) < 10**(-1)] = 0
+        self.fig_coefs_mag_db = CoefStem(width=5, height=4, db=1, mag=1)
+        layout_figs2.addWidget(self.fig_coefs_mag_db)
 
         # Plot for the phase of the Fourier coefficients
-        fig_coefs_phase = CoefStem(width=5, height=4, coefs1=np.angle(coefs1), npoints1=npoints1, coefs2=np.angle(coefs2), npoints2=npoints2, db=0, mag=0)
-        layout_figs1.addWidget(fig_coefs_phase)
+        self.fig_coefs_phase = CoefStem(width=5, height=4, db=0, mag=0)
+        layout_figs1.addWidget(self.fig_coefs_phase)
 
         # Plot for the phase of the Fourier coefficients (hist)
-        fig_coefs_phase_hist = CoefHist(width=5, height=4, coefs1=np.angle(coefs1), npoints1=npoints1, coefs2=np.angle(coefs2), npoints2=npoints2)
-        layout_figs2.addWidget(fig_coefs_phase_hist)
+        self.fig_coefs_phase_hist = CoefHist(width=5, height=4)
+        layout_figs2.addWidget(self.fig_coefs_phase_hist)
 
         layout.addLayout(layout_figs1)
         layout.addLayout(layout_figs2)
@@ -166,30 +410,170 @@ class MainWindow(qt.QMainWindow):
         widget.setLayout(layout)
         self.setCentralWidget(widget)
 
+        self.update_data(zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2)
+
         self.show()
-            
-def create_window(zpoints1, coefs1, zpoints2=np.array([]), coefs2=np.array([])):
-    '''Function to generate a GUI window to view plots of the shape(s) and 
-    Fourier coeffeicients.
+
+    def update_data(self, zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2):
+        '''Function to replace the data shown in every plot
+
+        args:
+            zpoints1 : numpy array of z values to be plotted to draw shape 1
+            coefs1 : numpy array of coefficients used to draw shape 1
+            npoints1 : numpy array of n values of coefs1
+            zpoints2 : numpy array of z values to be plotted to draw shape 2, may be empty
+            coefs2 : numpy array of coefficients used to draw shape 2, may be empty
+            npoints2 : numpy array of n values of coefs2
+
+        '''
+        self.fig_shape.update_data(zpoints1, zpoints2)
+        self.fig_coefs.update_data(coefs1, npoints1, coefs2, npoints2)
+        self.fig_coefs_mag.update_data(np.abs(coefs1), npoints1, np.abs(coefs2), npoints2)
+        self.fig_coefs_mag_db.update_data(convert_db(np.abs(coefs1)), npoints1, convert_db(np.abs(coefs2)), npoints2)
+
+        # Set the phase of very small FDs to zero, to avoid random phase values
+        phase1 = np.where(np.abs(coefs1) < 10**(-1), 0, np.angle(coefs1))
+        self.fig_coefs_phase.update_data(phase1, npoints1, np.angle(coefs2), npoints2)
+        self.fig_coefs_phase_hist.update_data(phase1, npoints1, np.angle(coefs2), npoints2)
+
+    def add_sliders(self, coefs, polygon=False, att=0, terms=None, T=100):
+        '''Function to add sliders for the low pass filter attenuation, the number of terms and the
+        reconstruction resolution. Slider changes are debounced, then filter_shape runs on a worker thread
+        and the plots are updated with the result, unless a newer slider position has made it stale.
+        Calling it again replaces the explored coefficients.
+
+        args:
+            coefs : numpy array of FDs (circular, centred on c0) or PFDs (from 0 to N-1)
+            polygon : (optional) True if coefs are PFDs, which disables the number of terms slider
+            att : (optional) starting attenuation
+            terms : (optional) starting number of terms, default all of them
+            T : (optional) starting number of points to reconstruct
+
+        '''
+        self.source = {'coefs': np.array(coefs, dtype=np.complex_), 'polygon': polygon}
+
+        if self.sliders is None:
+            layout_sliders = qt.QHBoxLayout()
+            self.sliders = {}
+            self.slider_labels = {}
+            for name in ('att', 'terms', 'T'):
+                self.slider_labels[name] = qt.QLabel()
+                self.sliders[name] = qt.QSlider(QtCore.Qt.Orientation.Horizontal)
+                layout_sliders.addWidget(self.slider_labels[name])
+                layout_sliders.addWidget(self.sliders[name])
+            self.centralWidget().layout().addLayout(layout_sliders)
+
+            # Attenuation in steps of 0.01
+            self.sliders['att'].setRange(0, 2000)
+            self.sliders['T'].setRange(10, 2000)
+
+            # Restarted by every slider change, so only the resting position is computed
+            self.debounce = QtCore.QTimer(self)
+            self.debounce.setSingleShot(True)
+            self.debounce.setInterval(debounce_ms)
+            self.debounce.timeout.connect(self.request)
+
+            # Worker thread, with requests and results passed by queued signals
+            self.generation = 0
+            self.worker = FilterWorker()
+            self.worker_thread = QtCore.QThread(self)
+            self.worker.moveToThread(self.worker_thread)
+            self.requested.connect(self.worker.compute)
+            self.worker.finished.connect(self.show_result)
+            self.worker_thread.start()
+            get_app().aboutToQuit.connect(self.stop_worker)
+
+            for slider in self.sliders.values():
+                slider.valueChanged.connect(self.schedule)
+
+        for slider in self.sliders.values():
+            slider.blockSignals(True)
+        self.sliders['att'].setValue(int(round(100*att)))
+        self.sliders['terms'].setRange(1, self.source['coefs'].size)
+        self.sliders['terms'].setValue(terms or self.source['coefs'].size)
+        self.sliders['terms'].setEnabled(not polygon)
+        self.sliders['T'].setValue(T)
+        for slider in self.sliders.values():
+            slider.blockSignals(False)
+
+        self.update_labels()
+        self.request()
+
+    def params(self):
+        return {'coefs': self.source['coefs'], 'polygon': self.source['polygon'], 'att': self.sliders['att'].value()/100,
+                'terms': self.sliders['terms'].value(), 'T': self.sliders['T'].value()}
+
+    def update_labels(self):
+        params = self.params()
+        self.slider_labels['att'].setText(f'Attenuation: {params["att"]:.2f}')
+        self.slider_labels['terms'].setText(f'Terms: {params["terms"]}')
+        self.slider_labels['T'].setText(f'Resolution: {params["T"]}')
+
+    def schedule(self):
+        self.update_labels()
+        self.debounce.start()
+
+    def request(self):
+        # Newer generations make every queued or running request stale
+        self.generation += 1
+        self.worker.latest = self.generation
+        self.requested.emit(self.generation, self.params())
+
+    def show_result(self, generation, data):
+        if generation == self.generation:
+            self.update_data(*data)
+
+    def stop_worker(self):
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+
+def create_window(zpoints1, coefs1, zpoints2=np.array([]), coefs2=np.array([]), block=True):
+    '''Function to generate a GUI window to view plots of the shape(s) and
+    Fourier coeffeicients. The window is created on the first call and reused by later calls,
+    which only replace the plotted data.
 
     args:
         zpoints1 : numpy array of z values to be plotted to draw shape 1
         coefs1 : numpy array of coefficients used to draw shape 1
         zpoints2 : (optional) numpy array of z values to be plotted to draw shape 2
         coefs2 : (optional) numpy array of coefficients used to draw shape 2
-    
+        block : (optional) set to False to return straight away, leaving the window open for further updates
+
     '''
+    global window
 
     # Set to one to centre coefficients around zero
     shift = 0
 
     # Determine coefs array size
-    nsize1 = len(coefs1)
-    npoints1 = np.linspace(0, nsize1-1, nsize1, dtype=int) - shift*int(nsize1/2)
-    nsize2 = len(coefs2)
-    npoints2 = np.linspace(0, nsize2-1, nsize2, dtype=int) - shift*int(nsize2/2)
-
-    # Generate output window
-    app = qt.QApplication(sys.argv)
-    window = MainWindow(zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2, shift)
-    app.exec()
\ No newline at end of file
+    npoints1 = index_points(len(coefs1), shift)
+    npoints2 = index_points(len(coefs2), shift)
+
+    # Generate output window, or update the existing one
+    app = get_app()
+    if window is None:
+        window = MainWindow(zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2, shift)
+    else:
+        window.update_data(zpoints1, coefs1, npoints1, zpoints2, coefs2, npoints2)
+        window.show()
+
+    if block:
+        app.exec()
+    else:
+        app.processEvents()
+
+def create_explorer(coefs, polygon=False, att=0, T=100):
+    '''Function to open the GUI window with sliders to explore low pass filtering and truncation of a set of
+    FDs interactively, showing the original shape and the filtered shape rescaled to the original area.
+
+    args:
+        coefs : numpy array of FDs (circular, centred on c0) or PFDs (from 0 to N-1)
+        polygon : (optional) True if coefs are PFDs
+        att : (optional) starting attenuation
+        T : (optional) starting number of points to reconstruct
+
+    '''
+    data = filter_shape(np.array(coefs, dtype=np.complex_), polygon, att, np.size(coefs), T)
+    create_window(data[0], data[1], data[3], data[4], block=False)
+    window.add_sliders(coefs, polygon, att, None, T)
+    get_app().exec()
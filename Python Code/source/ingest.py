@@ -0,0 +1,293 @@
+'''
+@file: ingest.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Batch ingestion of a directory of images into a single FD dataset (.npz)
+'''
+
+# Import dependancies
+import os
+import sys
+import glob
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import cv2 as cv
+import data_io as io
+
+def file_hash(filename):
+    '''Function to compute the content hash used to recognise images that are already stored
+
+    args:
+        filename : filename of the image
+
+    returns:
+        digest : hex SHA-1 digest of the file contents
+
+    '''
+    digest = hashlib.sha1()
+    with open(filename, mode='rb') as file:
+        for block in iter(lambda: file.read(2**20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def process_image(filename, num_points, digest):
+    '''Function run by the worker processes to extract the boundary, vertices and FDs of the shape in one image. The
+    image is read and thresholded once for both the boundary and the vertices, as in io.get_boundary and
+    io.get_vertices.
+
+    args:
+        filename : filename of the image containing the shape
+        num_points : number of points along shape boundary
+        digest : content hash of the image, already found by the parent process
+
+    returns:
+        record : dictionary of the name, hash, boundary, circular FDs, vertices and PFDs of the shape
+
+    '''
+    # Find the coordinates of points on the shape boundary
+    thresh = io.get_threshold(filename)
+    contour = cv.findContours(thresh, cv.RETR_LIST, cv.CHAIN_APPROX_NONE)[0][0]
+
+    # Resample the boundary and extract the vertices from the same contour
+    boundary = io.resample_boundary(contour[:, 0, 0] - 1j*contour[:, 0, 1], num_points)
+    approx = cv.approxPolyDP(contour, 0.01 * cv.arcLength(contour, True), True)
+    vertices = (approx[:, 0, 0] - 1j*approx[:, 0, 1]).astype(np.complex_)
+
+    return {'name': os.path.basename(filename),
+            'hash': digest,
+            'boundary': boundary,
+            'coefs': np.fft.fftshift(np.fft.fft(boundary))/num_points,
+            'vertices': vertices,
+            'pfds': np.fft.fft(vertices)}
+
+def shard_paths(path):
+    '''Function to list the checkpoint shards written next to a dataset by an ingest run that has not finished
+
+    args:
+        path : filename of the .npz dataset
+
+    returns:
+        paths : sorted list of shard filenames
+    '''
+    return sorted(glob.glob(glob.escape(path) + '.part*.npz'))
+
+def load_records(path):
+    '''Function to load the records of one .npz file written by save_dataset. Every column is read from the file
+    once and the records are views of the rows of those columns.
+
+    args:
+        path : filename of the .npz file
+
+    returns:
+        records : list of record dictionaries, in the order they were stored
+        files : dictionary mapping each image filename to the hash of the record it was stored as
+
+    '''
+    with np.load(path) as data:
+        columns = {key: data[key] for key in data.files}
+
+    # Datasets written before the file index map each record's own name to it
+    if 'file_name' not in columns:
+        columns['file_name'], columns['file_hash'] = columns['name'], columns['hash']
+    files = dict(zip(columns['file_name'].tolist(), columns['file_hash'].tolist()))
+
+    # Split the ragged columns at the offsets
+    offsets = columns['vertex_offsets']
+    vertices = np.split(columns['vertices'], offsets[1:-1])
+    pfds = np.split(columns['pfds'], offsets[1:-1])
+
+    records = [{'name': str(name),
+                'hash': str(digest),
+                'boundary': boundary,
+                'coefs': coefs,
+                'vertices': vertices[i],
+                'pfds': pfds[i]} for i, (name, digest, boundary, coefs) in
+               enumerate(zip(columns['name'], columns['hash'], columns['boundary'], columns['coefs']))]
+
+    return records, files
+
+def file_rows(records, files):
+    '''Function to turn a mapping of image filenames to record hashes into a mapping of filenames to rows
+
+    args:
+        records : list of record dictionaries
+        files : dictionary mapping image filenames to record hashes
+
+    returns:
+        index : dictionary mapping image filenames to rows in records
+    '''
+    rows = {record['hash']: i for i, record in enumerate(records)}
+    return {name: rows[digest] for name, digest in files.items()}
+
+def load_dataset(path):
+    '''Function to load an FD dataset written by save_dataset, followed by any checkpoint shards left by an
+    interrupted ingest run
+
+    args:
+        path : filename of the .npz dataset
+
+    returns:
+        records : list of record dictionaries, in the order they were stored
+        index : dictionary mapping every ingested image filename to its row in records, images with the same
+                content sharing a row
+
+    '''
+    records = []
+    files = {}
+    for filename in ([path] if os.path.exists(path) else []) + shard_paths(path):
+        shard_records, shard_files = load_records(filename)
+        records += shard_records
+        files.update(shard_files)
+
+    return records, file_rows(records, files)
+
+def save_dataset(path, records, num_points, files):
+    '''Function to write records to a columnar .npz dataset. Boundaries and circular FDs are stored as 2D arrays with
+    one row per image. Vertices and PFDs are ragged, so they are stored end to end with an offset table, the rows of
+    image i being vertex_offsets[i] to vertex_offsets[i+1]. The image filenames are stored with the hash of the
+    record they map to, so duplicate images point at one record. The file is replaced atomically.
+
+    args:
+        path : filename of the .npz dataset
+        records : list of record dictionaries
+        num_points : number of points along each shape boundary
+        files : dictionary mapping image filenames to record hashes
+
+    '''
+    sizes = [record['vertices'].size for record in records]
+    columns = {
+        'file_name': np.array(list(files.keys()), dtype=str),
+        'file_hash': np.array(list(files.values()), dtype=str),
+        'name': np.array([record['name'] for record in records], dtype=str),
+        'hash': np.array([record['hash'] for record in records], dtype=str),
+        'boundary': np.array([record['boundary'] for record in records], dtype=np.complex_).reshape(-1, num_points),
+        'coefs': np.array([record['coefs'] for record in records], dtype=np.complex_).reshape(-1, num_points),
+        'vertex_offsets': np.concatenate(([0], np.cumsum(sizes))).astype(np.int64),
+        'vertices': np.concatenate([record['vertices'] for record in records] + [np.array([], dtype=np.complex_)]),
+        'pfds': np.concatenate([record['pfds'] for record in records] + [np.array([], dtype=np.complex_)]),
+    }
+
+    temp = path + '.tmp.npz'
+    np.savez(temp, **columns)
+    os.replace(temp, path)
+
+def ingest(directory, output, num_points=100, pattern='*.png', workers=None, max_pending=None, checkpoint=100):
+    '''Function to ingest every image in a directory into an FD dataset using a pool of worker processes. Images whose
+    content hash is already stored in the output dataset, or that repeat an earlier image in the run, are not
+    processed again but are added to the index pointing at the stored record, so an interrupted run can be resumed.
+    The images are hashed in the pool. Each checkpoint writes only the new records to a shard file next to the
+    dataset, and the shards are merged into the dataset once at the end of the run.
+
+    args:
+        directory : folder containing the images
+        output : filename of the .npz dataset
+        num_points : (optional) number of points along each shape boundary
+        pattern : (optional) glob pattern of the image filenames
+        workers : (optional) number of worker processes, default the number of CPUs
+        max_pending : (optional) largest number of images in flight at once, default twice the number of workers
+        checkpoint : (optional) number of new images between writes of a checkpoint shard
+
+    returns:
+        records : list of record dictionaries in the dataset
+        index : dictionary mapping every ingested image filename to its row in records
+        failed : list of (filename, error message) for images that could not be processed
+
+    '''
+    records, index = load_dataset(output)
+    if records and records[0]['boundary'].size != num_points:
+        raise ValueError(f'{output} was written with {records[0]["boundary"].size} boundary points, not {num_points}')
+    files = {name: records[row]['hash'] for name, row in index.items()}
+    stored = {record['hash'] for record in records}
+    shards = len(shard_paths(output))
+
+    filenames = sorted(glob.glob(os.path.join(directory, pattern)))
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or 2*workers
+    failed = []
+    saved = len(records)
+    unsaved_files = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = dict(zip(filenames, pool.map(file_hash, filenames, chunksize=16)))
+
+        # Index images already in the dataset, and process only the first image with each new hash
+        copies = {}
+        todo = []
+        for filename in filenames:
+            digest = hashes[filename]
+            if digest in stored:
+                unsaved_files[os.path.basename(filename)] = digest
+            elif digest in copies:
+                copies[digest].append(filename)
+            else:
+                copies[digest] = [filename]
+                todo.append(filename)
+        print(f'{len(filenames)} images, {len(filenames) - len(todo)} already stored or repeated, {len(todo)} to process')
+
+        pending = {}
+        queue = iter(todo)
+
+        while True:
+            # Keep a bounded number of images in flight
+            for filename in queue:
+                pending[pool.submit(process_image, filename, num_points, hashes[filename])] = filename
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+
+            done = wait(pending, return_when=FIRST_COMPLETED)[0]
+            for future in done:
+                filename = pending.pop(future)
+                duplicates = copies.pop(hashes[filename])
+                try:
+                    record = future.result()
+                except Exception as error:
+                    failed += [(duplicate, str(error)) for duplicate in duplicates]
+                    print(f'Failed {filename}: {error}', file=sys.stderr)
+                    continue
+
+                # Every copy of the image points at the one record
+                stored.add(record['hash'])
+                records.append(record)
+                for duplicate in duplicates:
+                    unsaved_files[os.path.basename(duplicate)] = record['hash']
+
+            # Write only the records and index entries since the last checkpoint
+            if len(records) - saved >= checkpoint:
+                save_dataset(f'{output}.part{shards:04d}.npz', records[saved:], num_points, unsaved_files)
+                files.update(unsaved_files)
+                unsaved_files = {}
+                saved = len(records)
+                shards += 1
+
+    # Merge the dataset and its shards into one file
+    files.update(unsaved_files)
+    if len(records) > saved or unsaved_files or shards or not os.path.exists(output):
+        save_dataset(output, records, num_points, files)
+        for shard in shard_paths(output):
+            os.remove(shard)
+    print(f'{len(records)} images stored in {output} for {len(files)} files, {len(failed)} failed')
+
+    return records, file_rows(records, files), failed
+
+def main():
+    '''Main program
+    '''
+    parser = argparse.ArgumentParser(description='Ingest a directory of images into an FD dataset')
+    parser.add_argument('directory', help='folder containing the images')
+    parser.add_argument('output', help='filename of the .npz dataset, resumed if it already exists')
+    parser.add_argument('-n', '--num-points', type=int, default=100, help='number of points along each boundary')
+    parser.add_argument('-p', '--pattern', default='*.png', help='glob pattern of the image filenames')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--max-pending', type=int, default=None, help='largest number of images in flight')
+    parser.add_argument('--checkpoint', type=int, default=100, help='number of new images between writes')
+    args = parser.parse_args()
+
+    ingest(args.directory, args.output, args.num_points, args.pattern, args.workers, args.max_pending, args.checkpoint)
+
+# Boiler plate guard for main()
+if __name__ == '__main__':
+    main()
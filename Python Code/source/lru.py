@@ -0,0 +1,95 @@
+'''
+@file: lru.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Least recently used cache shared by the arc length, inverse and PFD basis caches
+'''
+
+# Import dependancies
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+def coefs_key(kind, coefs, grid=None, num=None):
+    '''Function to build a content address for a result from the bytes and shape of the FDs and the
+    requested grid
+
+    args:
+        kind : name of the cached quantity, e.g. 'perim'
+        coefs : numpy array of FDs
+        grid : (optional) numpy array of t or s values the result was evaluated on
+        num : (optional) number of speed samples used for the arc length series
+
+    returns:
+        key : hex digest identifying the result
+
+    '''
+    coefs = np.ascontiguousarray(coefs, dtype=np.complex_)
+    digest = hashlib.sha1(kind.encode())
+    digest.update(b'shape%r' % (coefs.shape,))
+    digest.update(coefs.tobytes())
+    if grid is not None:
+        grid = np.ascontiguousarray(grid, dtype=float)
+        digest.update(b'grid%r' % (grid.shape,))
+        digest.update(grid.tobytes())
+    if num is not None:
+        digest.update(b'num%d' % num)
+    return digest.hexdigest()
+
+def sizeof(value):
+    '''Function to measure the bytes held by a cached value, a numpy array, a tuple of them, or an object
+    with an nbytes attribute
+
+    args:
+        value : cached value
+
+    returns:
+        nbytes : size in bytes
+    '''
+    if isinstance(value, tuple):
+        return sum(sizeof(item) for item in value)
+    return getattr(value, 'nbytes', 0)
+
+class LRUCache:
+    '''Constructor for a mapping that evicts its least recently used entries once it holds more than
+    maxsize entries or more than maxbytes bytes (as measured by sizeof). The newest entry is always kept.
+
+    args:
+        maxsize : (optional) maximum number of entries, default unbounded
+        maxbytes : (optional) maximum total size in bytes, default unbounded
+
+    '''
+
+    def __init__(self, maxsize=None, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def __setitem__(self, key, value):
+        if key in self.entries:
+            self.nbytes -= sizeof(self.entries.pop(key))
+        self.entries[key] = value
+        self.nbytes += sizeof(value)
+
+        # Evict least recently used entries, always keeping the newest one
+        while len(self.entries) > 1 and ((self.maxsize is not None and len(self.entries) > self.maxsize) or
+                                         (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+            self.nbytes -= sizeof(self.entries.popitem(last=False)[1])
+
+    def values(self):
+        return self.entries.values()
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
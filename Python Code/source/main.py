@@ -11,6 +11,7 @@ import scipy as sp
 import matplotlib.pyplot as plt
 
 import gui
+import arc_cache as ac
 import data_io as io
 import fourier as fr
 import polygon as pol
@@ -47,12 +48,12 @@ def main():
     print(fr.area(coefs))
     zpoints = fr.fourier_plot(tpoints(100), coefs)
     gui.create_window(zpoints, coefs)
-    plt.plot(tpoints(40), fr.s_param(tpoints(40), coefs))
+    plt.plot(tpoints(40), ac.default_cache.s_param(tpoints(40), coefs))
     plt.show()
     perim = fr.perim_from_z(zpoints)
     spoints = perim * np.arange(100) / 100
     coefs = fr.get_coefs_from_zpoints(zpoints, 100)
-    tpoints1 = fr.t_param(spoints, coefs)
+    tpoints1 = ac.default_cache.t_param(spoints, coefs)
     print(tpoints1)
     curvature = fr.curvature(coefs, spoints/perim)
     print(curvature)
@@ -61,7 +62,7 @@ def main():
     zpoints_newer = fr.fourier_plot(tpoints(100), coefs_new)
     print(fr.area(coefs_new))
     gui.create_window(zpoints_newer, coefs_new)
-    zpoints_newest = fr.fourier_plot(fr.s_param(tpoints(100), coefs_new)/perim, coefs_new)
+    zpoints_newest = fr.fourier_plot(ac.default_cache.s_param(tpoints(100), coefs_new)/perim, coefs_new)
     gui.create_window(zpoints_newest, coefs_new)
 
     
@@ -40,7 +40,7 @@ def main_for_lpf_star():
 
     polani.make_animation(fil_coefs, 'Redundant_PFD_example.mp4')       #Make animation of pentagon with redundant PFD, specifying the name of the mp4
 
-    cleaned_coefs = pol.removing_redundant_using_sinc(fil_coefs, 5, 0)  #Clean the PFD
+    cleaned_coefs, M = pol.remove_redundant(fil_coefs)                  #Clean the PFD, finding the number of essential vertices (5 for the star)
 
     polani.make_animation(cleaned_coefs, 'Clean_PFD_example.mp4')       #Make animation of pentagon with clean PFD, specifying the name of the mp4
 
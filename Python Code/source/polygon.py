@@ -6,53 +6,202 @@
 '''
 
 # Import dependancies
-from msvcrt import kbhit
-from tkinter import S
 import numpy as np
 #import scipy as sp
 import matplotlib.pyplot as plt
 from pynverse_modified.inverse import inversefunc
 import functools as ft
-import math
+from lru import LRUCache
+import filtering as flt
 
 # Complex polygon basis function
 poly_func = lambda k, N, t : np.exp(1j*2*np.pi*k/N*np.floor(N*t))*(1+(np.exp(1j*2*np.pi*k/N)-1)*(N*t-np.floor(N*t)))
 poly_func_derivative = lambda k, N, m : N * np.exp(1j*2*np.pi*k*m/N) * (np.exp(1j*2*np.pi*k/N)-1)
 #poly_func_derivative = lambda k, N, tpoints : N * np.exp(1j*2*np.pi*k/N*np.floor(N*tpoints)) * (np.exp(1j*2*np.pi*k/N)-1)
 
+# Cache of PFD basis tables keyed by (N, T), bounded by total size in bytes
+basis_cache = LRUCache(maxbytes=64*2**20)
+
+def poly_basis(N, tpoints):
+    '''Function to return the N x T table of PFD basis functions poly_func(k, N, t). Tables for the uniform grid
+    t = j/T are cached by (N, T), evicting the least recently used tables once basis_cache.maxbytes is exceeded.
+
+    args:
+        N : number of PFDs
+        tpoints : number of points T of the uniform grid, or numpy array of t parameter inputs
+
+    returns:
+        basis : read-only numpy array with basis[k] = poly_func(k, N, tpoints)
+    
+    '''
+
+    if np.ndim(tpoints) == 0:
+        tpoints = np.arange(int(tpoints)) / int(tpoints)
+    tpoints = np.asarray(tpoints, dtype=float)
+    T = tpoints.size
+
+    # Only uniform grids are cached, any other t values are evaluated directly
+    uniform = tpoints.ndim == 1 and np.allclose(tpoints, np.arange(T) / T, rtol=0, atol=1e-12)
+    if not uniform:
+        return poly_func(np.arange(N)[:, np.newaxis], N, tpoints.ravel())
+
+    key = (N, T)
+    if key in basis_cache:
+        return basis_cache[key]
+
+    basis = poly_func(np.arange(N)[:, np.newaxis], N, np.arange(T)[np.newaxis, :] / T)
+    basis.setflags(write=False)
+    basis_cache[key] = basis
+    return basis
+
+def sub_polygons(tpoints, coefs):
+    '''Function to evaluate every sub-polygon 1/N*coefs[k]*poly_func(k, N, t) in one broadcast multiply.
+
+    args:
+        tpoints : number of points T of the uniform grid, or numpy array of t parameter inputs
+        coefs : numpy array of PFDs from 0 to N-1
+
+    returns:
+        shapes : N x T numpy array with the sub-polygon for coefs[k] in row k
+    
+    '''
+
+    N = len(coefs)
+    return np.asarray(coefs)[:, np.newaxis] / N * poly_basis(N, tpoints)
+
 def polygon_plot(tpoints, coefs):
-    N = coefs.size
-    zpoints = np.zeros(tpoints.size, dtype=np.complex_)
-    for k in range(0, N):
-        zpoints += 1/N*coefs[k]*poly_func(k, N, tpoints)
-    return zpoints
+    '''Function to plot the polygon described by one or many sets of PFDs. The PFD basis is exactly
+    linear interpolation between the vertices ifft(coefs), so the vertices are found with one inverse
+    FFT and interpolated at the t values.
+
+    args:
+        tpoints : numpy array of t parameter inputs
+        coefs : numpy array of PFDs from 0 to N-1, or 2D numpy array with one set of PFDs per row
+
+    returns:
+        zpoints : numpy array of points on the polygon, with one row per set of PFDs when coefs is 2D
+
+    '''
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    tpoints = np.asarray(tpoints, dtype=float)
+    N = coefs.shape[-1]
+
+    # Vertices of the polygon, vertices[m] is the point at t = m/N
+    vertices = np.fft.ifft(coefs, axis=-1)
+
+    # Segment index and fractional position along the segment for each t value
+    m = np.floor(N*tpoints)
+    frac = N*tpoints - m
+    m = m.astype(int) % N
+
+    return vertices[..., m] + frac*(vertices[..., (m+1) % N] - vertices[..., m])
 
 def removing_redundant_using_sinc(coefs, M, p):
     '''Function to remove redundant points of PFD
 
     args:
-        coefs : input numpy array of coefs from 0 to N-1
-        M : The number of essential vertices
+        coefs : input numpy array of coefs from 0 to N-1, or 2D numpy array with one set of coefs per row
+        M : The number of essential vertices, or a list of numbers of essential vertices to try, whose indices and
+            gains are computed together
         p : A number from 0 to M-1, any number will give the same results 
         
 
     returns:
-        new_coefs : Cleaned coefficients array 
+        new_coefs : Cleaned coefficients array, or list of arrays when M is a list
     
     '''
 
-    N = coefs.size 
-    new_coefs = np.zeros(M, dtype=np.complex_) 
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    N = coefs.shape[-1]
+    Ms = np.atleast_1d(M)[:, np.newaxis]
+    m = np.arange(np.max(Ms))
+
+    # Indices and gains for every M at once, one row per M padded to the largest M
+    valid = m < Ms
+    index = np.where(valid, p*Ms + m, 0)
 
     #First cleaned coefficients is always the derived from the first coefficient
-    new_coefs[0] = (M/N) * coefs[0]
+    index[:, 0] = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gains = np.where(valid, (Ms*(np.sinc(index/N)**2))/(N*(np.sinc(index/Ms)**2)), 0)
+    gains[:, 0] = Ms[:, 0]/N
 
-    for m in range(1, M):
-        new_coefs[m] = ((M*(np.sinc((p*M+m)/N)**2))/(N*(np.sinc((p*M+m)/M)**2)))*coefs[p*M+m]
+    new_coefs = gains*coefs[..., index]
 
+    if np.ndim(M):
+        return [new_coefs[..., i, :size] for i, size in enumerate(Ms[:, 0])]
+    return new_coefs[..., 0, :]
 
-    return new_coefs
+def find_essential_vertices(coefs, tol=1e-2, min_vertices=3):
+    '''Function to find the smallest number of essential vertices M that reproduces the shape. Only divisors of N can give
+    redundant PFDs, so each divisor is tried in increasing order: the PFDs are cleaned with removing_redundant_using_sinc and
+    the resulting M-gon is checked at the original N vertices with one inverse FFT. The tolerance is relative to the
+    perimeter because io.get_vertices only locates vertices to within 1% of the perimeter (the approxPolyDP epsilon),
+    so the default accepts an M-gon that is as close to the shape as the traced vertices are to the image. Shapes
+    that are genuinely not M-gons, such as the star before low pass filtering, miss by far more than this.
 
+    args:
+        coefs : input numpy array of coefs from 0 to N-1, or 2D numpy array with one set of coefs per row
+        tol : (optional) largest vertex error accepted, relative to the perimeter
+        min_vertices : (optional) smallest number of essential vertices to consider
+
+    returns:
+        M : number of essential vertices, or numpy array with one number per set of coefs when coefs is 2D
+    
+    '''
+
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    N = coefs.shape[-1]
+    vertices = np.fft.ifft(coefs, axis=-1)
+    perim = np.sum(np.abs(vertices - np.roll(vertices, 1, axis=-1)), axis=-1)
+
+    # Every set of coefs reproduces itself with M = N
+    M = np.full(coefs.shape[:-1], N)
+    found = np.zeros(coefs.shape[:-1], dtype=bool)
+    tpoints = np.arange(N) / N
+
+    for candidate in range(min_vertices, N):
+        if N % candidate or found.all():
+            continue
+
+        # Evaluate the cleaned M-gon at the original vertex positions t = n/N
+        cleaned = removing_redundant_using_sinc(coefs, candidate, 0)
+        error = np.max(np.abs(polygon_plot(tpoints, cleaned) - vertices), axis=-1)
+
+        matches = ~found & (error <= tol*perim)
+        M = np.where(matches, candidate, M)
+        found |= matches
+
+    return M[()]
+
+def remove_redundant(coefs, tol=1e-2, min_vertices=3):
+    '''Function to remove redundant points of PFD without knowing the number of essential vertices in advance
+
+    args:
+        coefs : input numpy array of coefs from 0 to N-1, or 2D numpy array with one set of coefs per row
+        tol : (optional) tolerance passed to find_essential_vertices
+        min_vertices : (optional) smallest number of essential vertices to consider
+        
+
+    returns:
+        new_coefs : Cleaned coefficients array, or list of arrays when coefs is 2D
+        M : The number of essential vertices, or numpy array with one number per set of coefs
+    
+    '''
+
+    M = find_essential_vertices(coefs, tol, min_vertices)
+    if np.ndim(M) == 0:
+        return removing_redundant_using_sinc(coefs, int(M), 0), M
+
+    # Clean all the sets that share a value of M together
+    coefs = np.asarray(coefs)
+    new_coefs = [None] * len(M)
+    for m in np.unique(M):
+        rows = np.flatnonzero(M == m)
+        for row, cleaned in zip(rows, removing_redundant_using_sinc(coefs[rows], int(m), 0)):
+            new_coefs[row] = cleaned
+
+    return new_coefs, M
 
 def building_block_plot(tpoints, coefs):
     '''Function to plot the sub-polygons that make up the final shape.
@@ -73,8 +222,10 @@ def building_block_plot(tpoints, coefs):
     figure, axis = plt.subplots(2, half_way) #create 2 rows and N/2 columns for subplots. When N is even the bottom left subplot will be empty 
                                              #since the first coefficient contains information on the location and is skipped
 
+    shapes = sub_polygons(tpoints, coefs)             #find all the sub-polygon shapes at once from the basis table
+
     for k in range(1, N):                             #skip first coefficients
-        shape = 1/N*coefs[k]*poly_func(k, N, tpoints) #find the sub-polygon shape using poly_func and multiply by 1/N and coefficients for the magnitude
+        shape = shapes[k]
 
         if((k-1) < half_way):                         # (k-1) so that the half_way point is included in the first row
             axis[0, k-1].plot(np.real(shape), np.imag(shape))
@@ -107,42 +258,46 @@ def area(coefs):
     '''find the area of a shape by applying the formula found through Green's Theorem 
 
     args:
-        coefs : input numpy array of coefs from 0 to N-1
+        coefs : input numpy array of coefs from 0 to N-1, or 2D numpy array with one set of coefs per row
 
     returns:
-        area value
+        area value, or numpy array of areas when coefs is 2D
     
     '''
 
-
-    N = len(coefs)
-    area = 0
-    for k in range(N):
-        area += np.abs(coefs[k])**2*np.sin(2*np.pi*k/N)
+    N = np.shape(coefs)[-1]
+    area = np.sum(np.abs(coefs)**2*np.sin(2*np.pi*np.arange(N)/N), axis=-1)
     area = area /(2*N)
     return np.abs(area)
 
-def poly_scale(coefs, new_coefs):
+def poly_scale(coefs, new_coefs, tol=1e-12):
     '''scale the new set of zpoints using the original set of z points
 
     args:
-        coefs : input numpy array of coefs from 0 to N-1
-        new_coefs : input numpy array of the other coefs from 0 to N-1
+        coefs : input numpy array of coefs from 0 to N-1, or 2D numpy array with one set of coefs per row
+        new_coefs : input numpy array of the other coefs from 0 to N-1, or 2D numpy array with one set per row
+        tol : (optional) rows of new_coefs with area below tol times the original area are left
+              unscaled, with a warning, instead of dividing by zero
 
     returns:
         new_coefs : other coefs scaled
     
     '''
 
-    a1 = area(coefs)        #find the area using the area func of both shapes
-    a2 = area(new_coefs)
-    scale_factor = a1/a2    #and find the ratio between the two
-    
-    new_coefs = new_coefs*math.sqrt(scale_factor)  #multiply the new shape by the square root of the ratio found. Square root since both x and
-                                                       #y are multiplied
-    new_coefs[0] = coefs[0]
-    
-    return new_coefs
+    return flt.area_scale(coefs, new_coefs, area, 0, tol)
+
+def get_frequencies(N):
+    '''Determines the signed frequency of each PFD, k for k up to N/2 and k-N after the half way point
+
+    args:
+        N : number of PFDs
+
+    returns:
+        kpoints : numpy array of frequencies
+    '''
+
+    kpoints = np.arange(N)
+    return np.where(kpoints <= int(N/2), kpoints, kpoints - N)
 
 def low_pass(coefs, att):
     '''Function to apply a low_pass filter to the coefficients
@@ -157,91 +312,147 @@ def low_pass(coefs, att):
     
     '''
 
-    nsize = coefs.size          #find the coefficient array size
-    half_way = int(nsize/2)     #when nsize is odd the half way value is rounded down
-    new_coefs = np.zeros(nsize, dtype=np.complex_)  #initialise and specify its type
+    #after the half way point the coefficient frequency starts decreasing so the filtering matches this
+    new_coefs = coefs / (1 + att * np.abs(get_frequencies(coefs.size)))
 
-    for k in range(0, nsize):     
-        if((k-1) < half_way):   #(k-1) to include the halfway point
-            new_coefs[k] = coefs[k] / (1 + att * k)
-        else:                   #since after the half way point the coefficient frequency starts decreasing make sure the filtering matches this
-            new_coefs[k] = coefs[k] / (1 + att * (nsize - k))
+    return new_coefs.astype(np.complex_)
 
-    return new_coefs
+def filter_bank(coefs, filters, rescale=True, tpoints=None):
+    '''Function to apply a bank of filters to one or many sets of PFDs in one broadcasted operation
 
-def check_collinearity(v0, v1, v2):
-    ''' Checks collinearity of three input points (v0, v1, v2), represented in complex coordinate form. Returns 1 if v1 is collinear
-    with v0 and v2. Returns 0 otherwise.
+    args:
+        coefs : input numpy array of coefs from 0 to N-1, or 2D numpy array with one set of coefs per row
+        filters : attenuation or numpy array of attenuations for the low_pass transfer function
+                  1 / (1 + att*|k|), or callable or list of callables mapping the array of signed frequencies
+                  (see get_frequencies) to the filter gains
+        rescale : (optional) scale each filtered set to the area of the original, default True
+        tpoints : (optional) numpy array of t values at which to also reconstruct the filtered shapes
+
+    returns:
+        new_coefs : numpy array of filtered coefs with shape coefs.shape[:-1] + (number of filters, N)
+        zpoints : (only if tpoints is given) numpy array of reconstructed shapes with shape
+                  coefs.shape[:-1] + (number of filters, T)
+    
     '''
-    m1 = np.imag(v1-v0) / np.real(v1-v0)
-    m2 = np.imag(v2-v1) / np.real(v2-v1)
-    tol = 0.1 * (m1 + m2) / 2 + 0.01
+
+    return flt.filter_bank(coefs, filters, get_frequencies(np.shape(coefs)[-1]), poly_scale, polygon_plot, rescale, tpoints)
+
+def check_collinearity(v0, v1, v2, tol=0.01):
+    ''' Checks collinearity of three input points (v0, v1, v2), represented in complex coordinate form. Returns True if v1 is collinear
+    with v0 and v2, i.e. if the path v0 -> v1 -> v2 continues in the same direction to within an angle of arcsin(tol). Works on arrays
+    of points, returning an array of booleans.
+    '''
+    e1 = v1 - v0
+    e2 = v2 - v1
+
+    # Cross product gives |e1||e2|sin(angle), dot product rules out paths that double back
+    cross = np.imag(np.conj(e1)*e2)
+    dot = np.real(np.conj(e1)*e2)
     
-    if (tol > 0):
-        return (m1-tol <= m2 <= m1+tol)
-    else:
-        return (m1+tol <= m2 <= m1-tol)
+    return (np.abs(cross) <= tol*np.abs(e1)*np.abs(e2)) & (dot > 0)
 
-def remove_collinear_points(coefs):
-    ''' Removes all PFDs correspoding to collinear vertices from an input array of PFDs
+def remove_collinear_points(coefs, tol=0.01, length_tol=1e-9):
+    ''' Removes all PFDs correspoding to collinear vertices from an input array of PFDs. Vertices that are collinear with their
+    neighbours (see check_collinearity) or that repeat the previous vertex are removed in vectorised passes until no more can be
+    removed. Each pass removes every other vertex of a run of removable vertices, so that every removal is checked against the
+    neighbours that remain.
 
     args:
         coefs : numpy array of PFDs for original shape
+        tol : (optional) collinearity tolerance, the sine of the largest turning angle treated as straight
+        length_tol : (optional) edges shorter than length_tol times the mean edge length are treated as repeated vertices
 
     returns:
         new_coefs : numpy array of PFDs for shape with collinear vertices removed
+        kept_index : numpy array of the indices of the vertices that were kept
 
     '''
 
-    # Initialise array of indexes of collinear points
-    iscollinear_index = []
-
     # Determine complex coordinates of vertices from FDs
     vertices = np.fft.ifft(coefs)
-
-    # Check collinearity of first vertex
-    if check_collinearity(vertices[vertices.size-1], vertices[0], vertices[1]):
-        iscollinear_index.append(0)
-
-    # Check collinearity of all vertices except first and last
-    for i in range(1, vertices.size-2):
-        if check_collinearity(vertices[i-1], vertices[i], vertices[i+1]):
-            iscollinear_index.append(i)
-
-    # Check collinearity of last vertex
-    if check_collinearity(vertices[vertices.size-2], vertices[vertices.size-1], vertices[0]):
-        iscollinear_index.append(vertices.size-1)
+    kept_index = np.arange(vertices.size)
+    min_length = length_tol * np.mean(np.abs(vertices - np.roll(vertices, 1)))
+
+    while vertices.size > 3:
+        prev_vertices = np.roll(vertices, 1)
+        next_vertices = np.roll(vertices, -1)
+        removable = check_collinearity(prev_vertices, vertices, next_vertices, tol) | (np.abs(vertices - prev_vertices) <= min_length)
+        if not removable.any():
+            break
+
+        # Start from a vertex that is kept so that no run wraps around the end of the array
+        start = np.argmin(removable) if not removable.all() else 0
+        removable = np.roll(removable, -start)
+        removable[0] = False
+
+        # Position of each vertex within its run of removable vertices, remove the even positions
+        index = np.arange(removable.size)
+        run_start = np.maximum.accumulate(np.where(removable, 0, index + 1))
+        remove = removable & ((index - run_start) % 2 == 0)
+        remove = np.roll(remove, start)
+
+        # Never reduce the shape below a triangle
+        if vertices.size - np.count_nonzero(remove) < 3:
+            remove[np.flatnonzero(remove)[vertices.size - 3:]] = False
+
+        vertices = vertices[~remove]
+        kept_index = kept_index[~remove]
     
-    # Delete the collinear vertices and determine new coefs
-    new_vertices = np.delete(vertices, iscollinear_index)
-    new_coefs = np.fft.fft(new_vertices)
+    # Determine new coefs from the remaining vertices
+    new_coefs = np.fft.fft(vertices)
     
-    return new_coefs
+    return new_coefs, kept_index
        
 def average(coefs, num):
     '''Reduces the number of FDs via the FD averaging method
 
     args:
-        coefs : numpy array of FDs
-        num : number of FDs to average to
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+        num : number of FDs to average to, or a list of numbers of FDs to try
+              (a convenience loop, each value needs its own reshape)
 
     returns:
-        nwe_coefs : numpy array of averaged FDs
+        nwe_coefs : numpy array of averaged FDs, or list of arrays when num is a list
     '''
 
-    new_coefs = np.array([])
-    for i in range(num):
-        subset = coefs[i::num]
-        amean = subset.sum() / len(subset)
-        new_coefs = np.append(new_coefs, amean)
-    return new_coefs
+    if np.ndim(num):
+        return [average(coefs, n) for n in num]
+
+    # Pad to a multiple of num with zeros, then FD i is the mean of column i of the reshaped array
+    coefs = np.asarray(coefs)
+    N = coefs.shape[-1]
+    rows = -(-N // num)
+    padded = np.zeros(coefs.shape[:-1] + (rows*num,), dtype=coefs.dtype)
+    padded[..., :N] = coefs
+    counts = rows - (np.arange(num) >= N - (rows-1)*num)
+
+    return padded.reshape(coefs.shape[:-1] + (rows, num)).sum(axis=-2) / counts
 
 def inverse_sinc(coefs, M):
-    new_coefs = np.zeros(M, dtype = np.complex_)
-    coefs = coefs/coefs.size
-    for m in range(0, M):
-        new_coefs[m] = (M*np.sinc(m/coefs.size)**2 / np.sinc(m/M)**2) * coefs[m]
-    return new_coefs
+    '''Reduces the number of FDs by undoing the sinc^2 weighting of the first M FDs
+
+    args:
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+        M : number of FDs to reduce to, or a list of numbers of FDs to try, whose gains are computed together
+
+    returns:
+        new_coefs : numpy array of reduced FDs, or list of arrays when M is a list
+    '''
+
+    coefs = np.asarray(coefs, dtype=np.complex_)
+    N = coefs.shape[-1]
+    Ms = np.atleast_1d(M)[:, np.newaxis]
+    m = np.arange(np.max(Ms))
+
+    # Gains for every M at once, one row per M padded to the largest M
+    valid = m < Ms
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gains = np.where(valid, Ms*np.sinc(m/N)**2 / np.sinc(m/Ms)**2, 0) / N
+    new_coefs = gains * coefs[..., np.newaxis, :m.size]
+
+    if np.ndim(M):
+        return [new_coefs[..., i, :size] for i, size in enumerate(Ms[:, 0])]
+    return new_coefs[..., 0, :]
 
 def start_shift(zpoints, shift):
     '''Shifts the starting point of a set of z values
@@ -262,6 +473,57 @@ def get_speed(m, coefs):
     speed = 1/N * np.abs(np.sum(coefs * poly_func_derivative(np.arange(N), N, m)))
     return speed
 
+def get_speeds(coefs):
+    '''Determines the speed |z'(t)| along every line segment of the polygon from the vertex differences.
+    The speed on segment m is N|v(m+1) - v(m)| where v = ifft(coefs), so it is constant along the segment.
+
+    args:
+        coefs : numpy array of PFDs, or 2D numpy array with one set of PFDs per row
+
+    returns:
+        speeds : numpy array of the N segment speeds, with one row per set of PFDs when coefs is 2D
+    '''
+
+    N = np.shape(coefs)[-1]
+    vertices = np.fft.ifft(coefs, axis=-1)
+    return N * np.abs(np.roll(vertices, -1, axis=-1) - vertices)
+
+def get_arc_table(coefs):
+    '''Determines the cumulative arc length at each vertex of the polygon.
+
+    args:
+        coefs : numpy array of PFDs
+
+    returns:
+        speeds : numpy array of the N segment speeds
+        cum_lengths : numpy array of the N+1 arc lengths at t = m/N, ending at the perimeter
+    '''
+
+    speeds = get_speeds(coefs)
+    cum_lengths = np.concatenate(([0], np.cumsum(speeds / len(coefs))))
+    return speeds, cum_lengths
+
+def s_param(tpoints, coefs):
+    '''Evaluate the arc length function s(t)
+
+    args:
+        tpoints = numpy array of input t-values
+        coefs = numpy array of PFDs
+    
+    returns:
+        spoints = numpy array of output s-values
+    '''
+
+    N = len(coefs)
+    speeds, cum_lengths = get_arc_table(coefs)
+
+    # Segment index, number of whole laps and position along the segment
+    tpoints = np.asarray(tpoints, dtype=float)
+    m = np.floor(N*tpoints).astype(int)
+    laps, m = np.divmod(m, N)
+
+    return laps*cum_lengths[-1] + cum_lengths[m] + (tpoints - (laps*N + m)/N)*speeds[m]
+
 def t_param(spoints, coefs):
     '''Solve the inverse function t(s) for s parameterisation
 
@@ -273,27 +535,17 @@ def t_param(spoints, coefs):
         tpoints = numpy array of output t-values
     '''
 
-    # Initialise parameters
     N = len(coefs)
-    tpoints = np.zeros(len(spoints))
-    m=0
-    i=0
-    speed = get_speed(0, coefs)
-    speed_sum = 0
-
-    while i < len(spoints):
-
-        # Calculate the t-points
-        tpoints[i] = spoints[i]/speed if m == 0 else spoints[i]/speed -  speed_sum/(N*speed) + m/N
-
-        # Determine the end point of the line segment and begin new line segment
-        if tpoints[i] > (m+1)/N:
-            m += 1
-            speed_sum += speed
-            speed = get_speed(m, coefs)
-        else:
-            i += 1
-    
+    speeds, cum_lengths = get_arc_table(coefs)
+
+    # Find the line segment containing each s value, skipping segments of zero length
+    spoints = np.asarray(spoints, dtype=float)
+    m = np.clip(np.searchsorted(cum_lengths, spoints, side='right') - 1, 0, N-1)
+
+    # s is linear in t along each segment
+    speed = np.where(speeds[m] > 0, speeds[m], np.inf)
+    tpoints = m/N + (spoints - cum_lengths[m])/speed
+
     # Return the result
     return tpoints
 
@@ -301,16 +553,30 @@ def get_perim(coefs):
     '''Determines the perimeter of the shape from the FDs.
 
     args:
-        coefs : numpy array of FDs
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
 
     returns:
-        perim : shape perimeter
+        perim : shape perimeter, or numpy array of perimeters when coefs is 2D
     '''
 
-    N = len(coefs)
-    speed_sum = 0
-    for i in range(N):
-        speed_sum += get_speed(i, coefs)
-    perim = speed_sum /  N
-    return perim
+    return np.sum(get_speeds(coefs), axis=-1) / np.shape(coefs)[-1]
+
+def segment_stats(coefs):
+    '''Determines the perimeter and line segment length statistics of the shape from the FDs.
+
+    args:
+        coefs : numpy array of FDs, or 2D numpy array with one set of FDs per row
+
+    returns:
+        stats : dictionary of the perimeter and the minimum, maximum, mean and standard deviation of the
+                segment lengths, each a numpy array with one value per set of FDs when coefs is 2D
+    '''
+
+    # Segment length is the constant speed along the segment times its duration 1/N
+    lengths = get_speeds(coefs) / np.shape(coefs)[-1]
 
+    return {'perim': np.sum(lengths, axis=-1),
+            'min': np.min(lengths, axis=-1),
+            'max': np.max(lengths, axis=-1),
+            'mean': np.mean(lengths, axis=-1),
+            'std': np.std(lengths, axis=-1)}
@@ -5,7 +5,6 @@ import data_io as io
 from math import tau # tau is constant number = 2*PI
 import polygon as pol
 
-poly_func = lambda k, N, t : np.exp(1j*2*np.pi*k/N*np.floor(N*t))*(1+(np.exp(1j*2*np.pi*k/N)-1)*(N*t-np.floor(N*t)))
 
 
 def make_animation(coefs, name):
@@ -142,11 +141,8 @@ def make_animation(coefs, name):
 
 
 
-    sub_poly = np.zeros((N-1, frames), dtype=np.complex_)
-
-    # find the sub_poly using the equation but ignore the first one since its not a sub_poly but locational information
-    for k in range(0, N-1):  
-        sub_poly[k] = 1/N*coefs[k+1]*poly_func(k+1, N, time)
+    # find the sub_poly using the shared basis table but ignore the first one since its not a sub_poly but locational information
+    sub_poly = pol.sub_polygons(time, coefs)[1:]
 
 
 
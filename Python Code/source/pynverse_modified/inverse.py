@@ -3,7 +3,12 @@ import warnings
 
 from scipy.optimize import minimize_scalar
 
-__all__ = ['inversefunc']
+__all__ = ['inversefunc', 'InverseFunction']
+
+# Maximum number of steps taken to bracket the values in the batched methods,
+# enough to halve the distance to an open domain end down to the smallest
+# double
+_BRACKET_ITER = 1100
 
 
 def inversefunc(func,
@@ -12,7 +17,14 @@ def inversefunc(func,
                 image=None,
                 open_domain=None,
                 args=(),
-                accuracy=2):
+                accuracy=2,
+                method='brent',
+                fprime=None,
+                xtol=1.48e-08,
+                max_iter=100,
+                vectorized=True,
+                table=None,
+                table_range=None):
     r"""Obtain the inverse of a function.
 
     Returns the numerical inverse of the function `f`. It may return a callable
@@ -61,12 +73,42 @@ def inversefunc(func,
         Number of digits for the desired accuracy. It will give a warning
         if the accuracy is worse than this.
         Default 2.
+    method : {'brent', 'illinois', 'bisect'}, optional
+        Root finder used to invert the function. 'brent' inverts each value
+        on its own with `scipy.optimize.minimize_scalar`. 'illinois' and
+        'bisect' invert all the values at once, so `func` is called on arrays
+        of points and the number of calls does not grow with the number of
+        values. They bracket every value, then refine the brackets with
+        the Illinois variant of regula falsi or with bisection.
+        Default 'brent'.
+    fprime : callable, optional
+        Derivative of `func`, taking the same arguments. When given, the
+        batched methods take a Newton step whenever it falls inside the
+        bracket. Ignored by 'brent'. Default None.
+    xtol : float, optional
+        Tolerance on the inverse values used by the batched methods, relative
+        to ``1 + |x|``. Default 1.48e-08.
+    max_iter : int, optional
+        Maximum number of refinement iterations of the batched methods.
+        Default 100.
+    vectorized : bool, optional
+        Whether `func` and `fprime` accept ndarrays. If False, the batched
+        methods call them one point at a time. Default True.
+    table : int, optional
+        Number of points of a coarse lookup table of `func`, evaluated once
+        when the inverse is created and used by the batched methods to
+        bracket each value without searching. Default None (no table).
+    table_range : float, ndarray, optional
+        Interval (`xmin`, `xmax`) inside the domain covered by the lookup
+        table. Default None, the domain, which must then be bounded.
 
     Returns
     -------
-    callable or ndarray
+    InverseFunction or ndarray
         Inverse function of `func`. It can take scalars or ndarrays, and return
-        objects of the same kind with the calculated inverse values.
+        objects of the same kind with the calculated inverse values. The
+        domain, image, trend and lookup table are kept by the object, so it
+        should be reused for repeated queries on the same function.
 
     Notes
     -----
@@ -95,48 +137,135 @@ def inversefunc(func,
     ...                      open_domain=True)
     >>> invtan([1, 0, -1]) # Should give [pi / 4, 0, -pi / 4]
     array([  7.85398163e-01,   1.29246971e-26,  -7.85398163e-01])
+    >>> inversefunc(np.exp, y_values=[1, np.e, 10], # Should give [0, 1, ln 10]
+    ...             method='illinois', fprime=np.exp)
+    array([ 0.        ,  1.        ,  2.30258509])
 
     """
 
-    domain, image, open_domain, args = _normparams_inversefunc(domain,
-                                                               image,
-                                                               open_domain,
-                                                               args)
+    inverse = InverseFunction(func, domain=domain, image=image,
+                              open_domain=open_domain, args=args,
+                              accuracy=accuracy, method=method,
+                              fprime=fprime, xtol=xtol, max_iter=max_iter,
+                              vectorized=vectorized, table=table,
+                              table_range=table_range)
+
+    if y_values is None:
+        return inverse
+    else:
+        return inverse(y_values)
 
-    ymin, ymax = image
-    xmin, xmax = domain
-    xmin_open, xmax_open = open_domain
 
-    # Calculating if the function is increasing or decreasing, using ref points
-    # anywhere in the valid range (Function has to be strictly monotonic)
-    ref1, ref2 = _get_valid_refpoints(xmin, xmax)
-    trend = np.sign(func(ref2, *args) - func(ref1, *args))
+class InverseFunction(object):
+    r"""Persistent numerical inverse of a strictly monotonic function.
 
-    if trend == 0:
-        raise ValueError("Function is not strictly monotonic")
+    Returned by `inversefunc` when no `y_values` are given, and taking the
+    same parameters. The domain, the image and the trend of the function,
+    and the optional lookup table, are worked out once when the object is
+    created, so each call only pays for refining the requested values. With
+    the batched methods the last solution is kept between calls and brackets
+    the next value, so values requested one call at a time in sorted order
+    start next to their root.
 
-    # Calculating the image by default
-    if ymin is None:
-        ymin = _auto_ymin(func, args, xmin, xmax, trend)
-    if ymax is None:
-        ymax = _auto_ymax(func, args, xmin, xmax, trend)
+    Attributes
+    ----------
+    domain, open_domain, image : tuple
+        Normalised domain, open ends and image of the function.
+    trend : float
+        1 if the function is increasing, -1 if it is decreasing.
+    table : tuple of ndarray or None
+        Lookup table points (x, func(x)).
+    last : tuple of float or None
+        Last solution (x, func(x)) found by the batched methods.
+
+    """
 
-    # Creating bounded function
-    def bounded_f(x):
+    def __init__(self, func, domain=None, image=None, open_domain=None,
+                 args=(), accuracy=2, method='brent', fprime=None,
+                 xtol=1.48e-08, max_iter=100, vectorized=True, table=None,
+                 table_range=None):
+
+        domain, image, open_domain, args = _normparams_inversefunc(domain,
+                                                                   image,
+                                                                   open_domain,
+                                                                   args)
+
+        if method not in ('brent', 'illinois', 'bisect'):
+            raise ValueError("method must be 'brent', 'illinois' or 'bisect'")
+
+        ymin, ymax = image
+        xmin, xmax = domain
+
+        # Calculating if the function is increasing or decreasing, using ref
+        # points anywhere in the valid range (Function has to be strictly
+        # monotonic)
+        ref1, ref2 = _get_valid_refpoints(xmin, xmax)
+        trend = np.sign(func(ref2, *args) - func(ref1, *args))
+
+        if trend == 0:
+            raise ValueError("Function is not strictly monotonic")
+
+        # Calculating the image by default
+        if ymin is None:
+            ymin = _auto_ymin(func, args, xmin, xmax, trend)
+        if ymax is None:
+            ymax = _auto_ymax(func, args, xmin, xmax, trend)
+
+        self.func = func
+        self.args = args
+        self.accuracy = accuracy
+        self.method = method
+        self.xtol = xtol
+        self.max_iter = max_iter
+        self.domain = domain
+        self.open_domain = open_domain
+        self.image = (ymin, ymax)
+        self.refpoints = (ref1, ref2)
+        self.trend = trend
+        self.last = None
+
+        # Functions of x alone for the batched methods
+        def bind(f):
+            if f is None:
+                return None
+            if vectorized:
+                return lambda x: f(x, *args)
+            return np.vectorize(lambda x: f(x, *args), otypes=[np.float64])
+        self._f = bind(func)
+        self._fprime = bind(fprime)
+
+        self.table = None
+        if table:
+            ends_open = (False, False)
+            if table_range is None:
+                if xmin is None or xmax is None:
+                    raise ValueError("table needs a bounded domain or a "
+                                     "table_range")
+                table_range = domain
+                ends_open = open_domain
+            x = np.linspace(table_range[0], table_range[1], table)
+            x = x[int(ends_open[0]):x.size - int(ends_open[1])]
+            with np.errstate(all='ignore'):
+                self.table = (x, np.asarray(self._f(x), dtype=np.float64))
+
+    # Function limited to the domain
+    def bounded_f(self, x):
+        xmin, xmax = self.domain
+        xmin_open, xmax_open = self.open_domain
         if xmin is not None and (x < xmin or (x == xmin and xmin_open)):
-                val = -1 * np.inf * trend
+                val = -1 * np.inf * self.trend
         elif xmax is not None and (x > xmax or (x == xmax and xmax_open)):
-                val = np.inf * trend
+                val = np.inf * self.trend
         else:
-            val = func(x, *args)
+            val = self.func(x, *self.args)
         return val
 
-    min_kwargs = {}
-    min_kwargs['bracket'] = (ref1, ref2)
-    min_kwargs['tol'] = 1.48e-08
-    min_kwargs['method'] = 'Brent'
+    def __call__(self, yin):
+        ymin, ymax = self.image
+        xmin, xmax = self.domain
+        xmin_open, xmax_open = self.open_domain
+        trend = self.trend
 
-    def inv(yin):
         yin = np.asarray(yin, dtype=np.float64)
         shapein = yin.shape
         yin = yin.flatten()
@@ -159,23 +288,103 @@ def inversefunc(func,
                                  " higher limit %g of the image" %
                                  (yin[mask], ymax))
 
+        if self.method == 'brent':
+            return self._inv_brent(yin).reshape(shapein)
+
+        a, b, fa, fb = self._brackets(yin)
+        results, resultsmask, residuals = _inv_batched(
+            self._f, self._fprime, yin, trend, xmin, xmax, xmin_open,
+            xmax_open, a, b, fa, fb, self.refpoints[1] - self.refpoints[0],
+            self.method, self.xtol, self.max_iter)
+        if any(~resultsmask):
+            warnings.warn("Trouble calculating inverse for values: "
+                          "%s" % str(yin[~resultsmask]), RuntimeWarning)
+        # Residuals of the last iterates are already known, so the accuracy
+        # check needs no further calls to func
+        if np.any(np.abs(residuals[resultsmask]) >=
+                  1.5 * 10**(-self.accuracy)):
+            warnings.warn("Results obtained with less than %g "
+                          "decimal digits of accuracy"
+                          % self.accuracy, RuntimeWarning)
+
+        if resultsmask.size and resultsmask[-1]:
+            self.last = (results[-1], yin[-1] + trend * residuals[-1])
+
+        return results.reshape(shapein)
+
+    def _brackets(self, yin):
+        # Starting brackets of the batched methods. NaN marks a residual
+        # still to be evaluated
+        ref1, ref2 = self.refpoints
+        trend = self.trend
+        a = np.full(yin.shape, ref1)
+        b = np.full(yin.shape, ref2)
+        fa = np.full(yin.shape, np.nan)
+        fb = np.full(yin.shape, np.nan)
+        found = np.zeros(yin.shape, dtype=bool)
+
+        # Lookup table interval holding each value
+        if self.table is not None:
+            tx, ty = self.table
+            k = np.searchsorted(trend * ty, trend * yin)
+            exact = k < tx.size
+            exact[exact] = ty[k[exact]] == yin[exact]
+            a[exact] = b[exact] = tx[k[exact]]
+            fa[exact] = fb[exact] = 0.
+            found = exact | ((k > 0) & (k < tx.size))
+            inside = found & ~exact
+            a[inside] = tx[k[inside] - 1]
+            b[inside] = tx[k[inside]]
+            fa[inside] = trend * (ty[k[inside] - 1] - yin[inside])
+            fb[inside] = trend * (ty[k[inside]] - yin[inside])
+
+        # Warm start from the last solution when it narrows the bracket, or
+        # from it alone when the table does not hold the value
+        if self.last is not None:
+            xl, fl = self.last
+            gl = trend * (fl - yin)
+            narrows = ~found | ((xl > a) & (xl < b))
+            lower = narrows & (gl <= 0)
+            upper = narrows & (gl > 0)
+            a[lower] = xl
+            fa[lower] = gl[lower]
+            b[upper] = xl
+            fb[upper] = gl[upper]
+            # The bracketing then steps out from the last solution
+            alone = ~found & lower
+            b[alone] = xl
+            fb[alone] = gl[alone]
+            alone = ~found & upper
+            a[alone] = xl
+            fa[alone] = gl[alone]
+
+        return a, b, fa, fb
+
+    def _inv_brent(self, yin):
+        xmin, xmax = self.domain
+
+        min_kwargs = {}
+        min_kwargs['bracket'] = self.refpoints
+        min_kwargs['tol'] = 1.48e-08
+        min_kwargs['method'] = 'Brent'
+
         results = yin.copy() * np.nan
         resultsmask = np.zeros(yin.shape, dtype=bool)
 
         for j in range(yin.size):
             if xmax is not None:
-                if bounded_f(xmax) == yin[j]:
+                if self.bounded_f(xmax) == yin[j]:
                     results[j] = xmax
                     resultsmask[j] = True
                     continue
             if xmin is not None:
-                if bounded_f(xmin) == yin[j]:
+                if self.bounded_f(xmin) == yin[j]:
                     results[j] = xmin
                     resultsmask[j] = True
                     continue
 
-            optimizer = (lambda x, j=j,
-                         bounded_f=bounded_f: (((bounded_f(x) - yin[j]))**2))
+            optimizer = (lambda x, j=j, bounded_f=self.bounded_f:
+                         (((bounded_f(x) - yin[j]))**2))
             try:
                 with warnings.catch_warnings(record=True):
                     result = minimize_scalar(optimizer, **min_kwargs)
@@ -188,19 +397,119 @@ def inversefunc(func,
                           "%s" % str(yin[~resultsmask]), RuntimeWarning)
 
         try:
-            np.testing.assert_array_almost_equal(yin, func(results, *args),
-                                                 decimal=accuracy)
+            np.testing.assert_array_almost_equal(yin,
+                                                 self.func(results, *self.args),
+                                                 decimal=self.accuracy)
         except AssertionError:
             warnings.warn("Results obtained with less than %g "
                           "decimal digits of accuracy"
-                          % accuracy, RuntimeWarning)
-
-        return results.reshape(shapein)
-
-    if y_values is None:
-        return inv
-    else:
-        return inv(y_values)
+                          % self.accuracy, RuntimeWarning)
+
+        return results
+
+
+def _inv_batched(f, fprime, yin, trend, xmin, xmax, xmin_open, xmax_open,
+                 a, b, fa, fb, step, method, xtol, max_iter):
+    # Residual increasing in x whatever the trend of f
+    def g(x, y):
+        with np.errstate(all='ignore'):
+            return trend * (np.asarray(f(x), dtype=np.float64) - y)
+
+    for x, fx in ((a, fa), (b, fb)):
+        unknown = np.isnan(fx)
+        if unknown.any():
+            fx[unknown] = g(x[unknown], yin[unknown])
+    failed = np.zeros(yin.shape, dtype=bool)
+
+    # Bracket every value by stepping the ends outwards with growing steps,
+    # moving halfway to the boundary of an open domain and onto the boundary
+    # of a closed one
+    for lower in (True, False):
+        x, fx, other, fother = (a, fa, b, fb) if lower else (b, fb, a, fa)
+        bound, bound_open = (xmin, xmin_open) if lower else (xmax, xmax_open)
+        sign = -1 if lower else 1
+        steps = np.full(yin.shape, float(step))
+        for _ in range(_BRACKET_ITER):
+            idx = np.nonzero(~(sign * fx >= 0) & ~failed)[0]
+            if idx.size == 0:
+                break
+            if bound is not None and not bound_open:
+                stuck = x[idx] == bound
+                failed[idx[stuck]] = True
+                idx = idx[~stuck]
+            # The old end lies beyond the root, so it becomes the other end
+            beyond = idx[sign * fx[idx] < 0]
+            other[beyond] = x[beyond]
+            fother[beyond] = fx[beyond]
+            new = x[idx] + sign * steps[idx]
+            if bound is not None:
+                outside = (new <= bound) if lower else (new >= bound)
+                if bound_open:
+                    new = np.where(outside, (x[idx] + bound) / 2., new)
+                else:
+                    new = np.where(outside, bound, new)
+            steps[idx] *= 2
+            x[idx] = new
+            fx[idx] = g(new, yin[idx])
+        else:
+            failed |= ~(sign * fx >= 0)
+
+    # Start from the end with the smaller residual
+    first = np.abs(fa) <= np.abs(fb)
+    x = np.where(first, a, b)
+    fx = np.where(first, fa, fb)
+    active = ~failed & (fa != 0) & (fb != 0)
+    side = np.zeros(yin.shape, dtype=int)
+
+    for _ in range(max_iter):
+        idx = np.nonzero(active)[0]
+        if idx.size == 0:
+            break
+        ai, bi, fai, fbi = a[idx], b[idx], fa[idx], fb[idx]
+        width = bi - ai
+        tol = xtol * (1 + np.abs(x[idx]))
+
+        with np.errstate(all='ignore'):
+            if method == 'illinois':
+                c = bi - fbi * width / (fbi - fai)
+                bad = ~((c > ai) & (c < bi))
+                c[bad] = ai[bad] + width[bad] / 2.
+            else:
+                c = ai + width / 2.
+
+            # Newton step from the last iterate when it stays in the bracket
+            newton = np.zeros(idx.size, dtype=bool)
+            if fprime is not None:
+                xn = x[idx] - fx[idx] / (trend * np.asarray(
+                    fprime(x[idx]), dtype=np.float64))
+                newton = (xn > ai) & (xn < bi)
+                c = np.where(newton, xn, c)
+
+        fc = g(c, yin[idx])
+        upper = ~(fc <= 0)
+        lower = fc < 0
+        b[idx[upper]] = c[upper]
+        fb[idx[upper]] = fc[upper]
+        a[idx[lower]] = c[lower]
+        fa[idx[lower]] = fc[lower]
+
+        # Illinois: halve the value at an end kept twice in a row
+        if method == 'illinois':
+            s = np.where(upper, 1, -1)
+            repeat = s == side[idx]
+            fa[idx[repeat & upper]] *= 0.5
+            fb[idx[repeat & lower]] *= 0.5
+            side[idx] = s
+
+        converged = ((fc == 0) | (b[idx] - a[idx] <= tol) |
+                     (newton & (np.abs(c - x[idx]) <= tol)))
+        x[idx] = c
+        fx[idx] = fc
+        active[idx[converged]] = False
+
+    success = ~active & ~failed
+    x[failed] = np.nan
+    return x, success, fx
 
 
 def _normparams_inversefunc(domain, image, open_domain, args):
@@ -0,0 +1,100 @@
+'''
+@file: reconstruction.py
+@author: Anthony White and Kili Miyamoto
+@date: 22/03/2023
+@brief: Incremental reconstruction of a shape from its FDs, updated in place when coefficients are edited or removed
+'''
+
+# Import dependancies
+import numpy as np
+import fourier as fr
+
+class Reconstruction:
+    '''Constructor for a reconstruction of the Fourier series on a fixed set of t values. Changing coefficient
+    cn by dc only adds dc*exp(i2pi*n*t) to the curve, so edits cost O(T) per coefficient instead of a full
+    resynthesis. The basis columns exp(i2pi*n*t) are cached as they are used, and the area sum of n*pi*|cn|^2
+    is updated alongside the curve.
+
+    args:
+        tpoints : numpy array of t parameter inputs to the Fourier series function
+        coefs : numpy array of FDs, centred on c0
+
+    '''
+
+    def __init__(self, tpoints, coefs):
+        self.tpoints = np.asarray(tpoints, dtype=float)
+        self.columns = {}
+        self.reset(coefs)
+
+    def reset(self, coefs):
+        '''Function to replace every coefficient and resynthesise the curve from scratch
+
+        args:
+            coefs : numpy array of FDs, centred on c0
+
+        '''
+        self.coefs = np.array(coefs, dtype=np.complex_)
+        self.npoints = fr.get_npoints(self.coefs.size)
+        self.zpoints = fr.fourier_synth(self.tpoints, self.coefs)
+        self.area_sum = np.sum(self.npoints * np.pi * np.absolute(self.coefs)**2)
+
+    def refresh(self):
+        '''Function to resynthesise the curve and area from the current coefficients, removing the rounding
+        error accumulated over many updates
+        '''
+        self.reset(self.coefs)
+
+    def basis(self, npoints):
+        '''Function to return the basis columns exp(i2pi*n*t) for the given n values, caching each column
+
+        args:
+            npoints : numpy array of n values
+
+        returns:
+            columns : 2D numpy array with one row per n value
+
+        '''
+        for n in np.unique(npoints):
+            if n not in self.columns:
+                self.columns[n] = np.exp(1j*2*np.pi*n*self.tpoints)
+        return np.array([self.columns[n] for n in np.ravel(npoints)]).reshape(np.shape(npoints) + self.tpoints.shape)
+
+    def update(self, index, values):
+        '''Function to set one or many coefficients, updating the curve and area by the change alone
+
+        args:
+            index : index, or numpy array of distinct indices, into the coefficient array (c0 at int(N/2))
+            values : new coefficient value(s), matching index
+
+        '''
+        index = np.atleast_1d(index)
+        values = np.broadcast_to(np.asarray(values, dtype=np.complex_), index.shape)
+        npoints = self.npoints[index]
+
+        # Rank-1 update for each changed coefficient
+        delta = values - self.coefs[index]
+        self.zpoints += np.tensordot(delta, self.basis(npoints), axes=1)
+        self.area_sum += np.sum(npoints * np.pi * (np.absolute(values)**2 - np.absolute(self.coefs[index])**2))
+        self.coefs[index] = values
+
+    def pop(self, num_terms=1):
+        '''Function to remove terms in the same order as fourier.pop. The remaining coefficients keep their
+        n values, so removing a term is the same as setting it to zero before shrinking the array.
+
+        args:
+            num_terms : (optional) number of terms to remove
+
+        '''
+        for i in range(num_terms):
+            index = self.coefs.size-1 if (self.coefs.size % 2) else 0
+            self.update(index, 0)
+            self.coefs = np.delete(self.coefs, index)
+            self.npoints = np.delete(self.npoints, index)
+
+    def area(self):
+        '''Function to return the area of the current shape, as fourier.area
+
+        returns:
+            area : area of the boundary
+        '''
+        return np.abs(self.area_sum)